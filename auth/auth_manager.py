@@ -1,27 +1,76 @@
 import json
 import logging
+import os
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service as ChromeService
 from selenium.webdriver.chrome.options import Options
 
+from managers.config import BASE_URL
+
 
 class AuthManager:
-    def __init__(self, cookies_file='data/cookies_data.ckjson'):
+    # Ресурсы, которые не нужны для заполнения форм и блокируются в облегченном режиме
+    BLOCKED_URLS = [
+        "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+        "*.woff", "*.woff2", "*.ttf", "*.otf",
+        "*.mp4", "*.webm", "*.mp3", "*.ogg",
+    ]
+    LEAN_ARGUMENTS = [
+        "--disable-gpu",
+        "--disable-extensions",
+        "--disable-background-networking",
+        "--disable-default-apps",
+        "--disable-sync",
+        "--disable-dev-shm-usage",
+        "--mute-audio",
+        "--no-first-run",
+        "--blink-settings=imagesEnabled=false",
+        "--window-size=1920,1080",
+    ]
+
+    def __init__(self, cookies_file='data/cookies_data.ckjson', lean=True, headless=True, profile_dir=None):
+        """
+        :param lean: Облегченный профиль: без картинок, шрифтов, медиа, GPU и фоновых сервисов.
+        :param headless: Запуск браузера без окна.
+        :param profile_dir: Каталог профиля Chrome, в котором сохраняются куки между запусками.
+                            Один каталог нельзя использовать в нескольких браузерах одновременно.
+        """
         self.cookies_file = cookies_file
+        self.lean = lean
+        self.headless = headless
+        self.profile_dir = profile_dir
         self.driver = self.init_driver()
 
     def init_driver(self):
         """Инициализация драйвера с опциями для оптимизации."""
         options = Options()
-        # Добавьте необходимые опции
-        # options.add_argument("--headless")
+        if self.headless:
+            options.add_argument("--headless=new")
+        if self.profile_dir:
+            options.add_argument(f"--user-data-dir={os.path.abspath(self.profile_dir)}")
+        if self.lean:
+            for argument in self.LEAN_ARGUMENTS:
+                options.add_argument(argument)
+            options.add_experimental_option("prefs", {
+                "profile.managed_default_content_settings.images": 2,
+                "profile.default_content_setting_values.notifications": 2,
+            })
+            # Не ждем загрузки картинок и стилей, достаточно готового DOM
+            options.page_load_strategy = 'eager'
         service = ChromeService()  # Убедитесь, что chromedriver доступен в PATH
         driver = webdriver.Chrome(service=service, options=options)
+
+        if self.lean:
+            # Блокировка запросов к картинкам, шрифтам и медиа на уровне сети
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": self.BLOCKED_URLS})
         return driver
 
-    def login(self, url="https://playerok.com"):
-        """Авторизация с загрузкой кук."""
-        self.driver.get(url)
+    def login(self, url=None):
+        """Авторизация с загрузкой кук. Если профиль уже авторизован, куки не загружаются повторно."""
+        self.driver.get(url or BASE_URL)
+        if self.profile_dir and self.is_logged_in():
+            return
         self.load_cookies()
 
     def load_cookies(self):
@@ -47,6 +96,21 @@ class AuthManager:
 
         self.driver.refresh()
 
+    def is_alive(self):
+        """Проверка, что браузер отвечает."""
+        try:
+            self.driver.current_url
+            return True
+        except Exception:
+            return False
+
+    def is_logged_in(self, cookie_name="token"):
+        """Проверка, что сессия не истекла: авторизационная кука все еще есть в браузере."""
+        try:
+            return self.driver.get_cookie(cookie_name) is not None
+        except Exception:
+            return False
+
     def close(self):
         """Закрытие браузера."""
         self.driver.quit()
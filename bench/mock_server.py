@@ -0,0 +1,387 @@
+import json
+import random
+import threading
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import default as default_policy
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+RETRY_LATER_TEXT = "Попробуйте позже"
+FREE_OBTAINING_TYPE = "Перевод виртов через игровой банк (без входа в аккаунт)"
+MUTATIONS = ("uploadFile", "createItem", "publishItem", "updateItem", "removeItem")
+
+
+def stable_id(*parts):
+    """Одинаковый между запусками id для игры, категории и т.п."""
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, "/".join(str(part) for part in parts)))
+
+
+class MockPlayerok:
+    """Состояние локального playerok: карточки пользователя, известные хеши запросов и счетчики.
+
+    :param latency: Задержка каждого ответа в секундах (к ней добавляется до latency_jitter секунд).
+    :param rate_429: Доля запросов, на которые отвечается 429 с Retry-After.
+    :param rate_403: Доля запросов, на которые отвечается 403.
+    :param retry_later_rate: Доля мутаций и страниц /sell, /edit с ответом 'Попробуйте позже'.
+    :param max_page_size: Наибольший размер страницы items, как на сайте.
+    :param server_labels: Названия серверов в опциях категорий (кроме 'Любой').
+    """
+
+    def __init__(self, latency=0.05, latency_jitter=0.0, rate_429=0.0, rate_403=0.0, retry_later_rate=0.0,
+                 max_page_size=24, server_labels=(), seed=None):
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.rate_429 = rate_429
+        self.rate_403 = rate_403
+        self.retry_later_rate = retry_later_rate
+        self.max_page_size = max_page_size
+        self.server_labels = list(server_labels)
+        self.random = random.Random(seed)
+        self.user_id = stable_id("user")
+        self.items = {}
+        self.categories = {}
+        self.persisted_queries = set()
+        self.lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.lock:
+            self.stats = {"requests": 0, "bytes_in": 0, "bytes_out": 0, "operations": {}, "injected": {}}
+
+    def count(self, operation, bytes_in, bytes_out):
+        with self.lock:
+            self.stats["requests"] += 1
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+            self.stats["operations"][operation] = self.stats["operations"].get(operation, 0) + 1
+
+    def inject(self, kind):
+        with self.lock:
+            self.stats["injected"][kind] = self.stats["injected"].get(kind, 0) + 1
+
+    def chance(self, rate):
+        with self.lock:
+            return rate > 0 and self.random.random() < rate
+
+    def delay(self):
+        with self.lock:
+            jitter = self.random.random() * self.latency_jitter
+        time.sleep(self.latency + jitter)
+
+    def seed_items(self, count, game_name, priority="CUSTOM"):
+        """Добавление count карточек пользователя в игре game_name. Возвращает их id."""
+        ids = []
+        for _ in range(count):
+            item = self.new_item(game_name, f"Карточка {len(self.items) + 1}", 100, priority)
+            ids.append(item["id"])
+        return ids
+
+    def new_item(self, game_name, name, price, priority="DEFAULT", attributes=None):
+        item_id = str(uuid.uuid4())
+        item = {
+            "id": item_id,
+            "slug": f"{item_id[:8]}-{len(self.items) + 1}",
+            "priority": priority,
+            "name": name,
+            "price": price,
+            "rawPrice": price,
+            "attributes": attributes or {},
+            "game": {"id": stable_id("game", game_name), "name": game_name},
+        }
+        with self.lock:
+            self.items[item_id] = item
+        return item
+
+    def find_item(self, item_id=None, slug=None):
+        with self.lock:
+            if item_id:
+                return self.items.get(item_id)
+            return next((item for item in self.items.values() if item["slug"] == slug), None)
+
+    # Ответы на GraphQL-операции: resolve_<operationName>(variables) -> data
+
+    def resolve_viewer(self, variables):
+        return {"viewer": {"id": self.user_id}}
+
+    def resolve_games(self, variables):
+        name = (variables.get("filter") or {}).get("search") or "Game"
+        category_id = stable_id("category", name)
+        self.categories[category_id] = name
+        node = {"id": stable_id("game", name), "name": name,
+                "categories": [{"id": category_id, "name": "Вирты"},
+                               {"id": stable_id("category", name, "accounts"), "name": "Аккаунты"}]}
+        return {"games": {"edges": [{"node": node}]}}
+
+    def resolve_gameCategory(self, variables):
+        category_id = variables.get("id")
+        options = [{"label": label, "field": "server", "value": stable_id("server", label)}
+                   for label in ["Любой"] + self.server_labels]
+        obtaining_types = [{"id": stable_id("obtaining", name), "name": name}
+                           for name in (FREE_OBTAINING_TYPE, "Передача через аккаунт")]
+        return {"gameCategory": {"id": category_id, "options": options},
+                "gameCategoryObtainingTypes": {"edges": [{"node": node} for node in obtaining_types]}}
+
+    def resolve_gameCategoryDataFields(self, variables):
+        category_id = (variables.get("filter") or {}).get("gameCategoryId")
+        return {"gameCategoryDataFields": {"edges": [{"node": {"id": stable_id("data_field", category_id)}}]}}
+
+    def resolve_uploadFile(self, variables):
+        return {"uploadFile": {"id": str(uuid.uuid4())}}
+
+    def resolve_createItem(self, variables):
+        item_input = variables["input"]
+        game_name = self.categories.get(item_input.get("gameCategoryId"), "Game")
+        item = self.new_item(game_name, item_input["name"], item_input["price"],
+                             attributes=item_input.get("attributes"))
+        return {"createItem": {"id": item["id"], "slug": item["slug"]}}
+
+    def resolve_itemPriorityStatuses(self, variables):
+        return {"itemPriorityStatuses": [{"id": stable_id("status", "free"), "price": 0},
+                                         {"id": stable_id("status", "premium"), "price": 99}]}
+
+    def resolve_publishItem(self, variables):
+        item = self.find_item(variables["input"]["itemId"])
+        if item is None:
+            raise LookupError("Item not found")
+        item["priority"] = "CUSTOM"
+        return {"publishItem": {"id": item["id"]}}
+
+    def resolve_updateItem(self, variables):
+        item = self.find_item(variables["input"]["id"])
+        if item is None:
+            raise LookupError("Item not found")
+        item["price"] = variables["input"]["price"]
+        return {"updateItem": {"id": item["id"]}}
+
+    def resolve_item(self, variables):
+        item = self.find_item(variables.get("id"), variables.get("slug"))
+        if item is None:
+            raise LookupError("Item not found")
+        return {"item": {key: item[key] for key in ("id", "priority", "attributes", "game")}}
+
+    def resolve_items(self, variables):
+        item_filter = variables.get("filter") or {}
+        pagination = variables.get("pagination") or {}
+        with self.lock:
+            items = [item for item in self.items.values()
+                     if not item_filter.get("gameId") or item["game"]["id"] == item_filter["gameId"]]
+        start = int(pagination.get("after") or 0)
+        size = min(pagination.get("first") or self.max_page_size, self.max_page_size)
+        page = items[start:start + size]
+        fields = ("id", "slug", "priority", "name", "price", "rawPrice")
+        return {"items": {
+            "edges": [{"node": {key: item[key] for key in fields}} for item in page],
+            "pageInfo": {"endCursor": str(start + len(page)), "hasNextPage": start + size < len(items)},
+            "totalCount": len(items),
+        }}
+
+    def resolve_removeItem(self, variables):
+        with self.lock:
+            item = self.items.pop(variables["id"], None)
+        if item is None:
+            raise LookupError("Item not found")
+        return {"removeItem": {"id": item["id"]}}
+
+    def resolve_batch_remove(self, variables):
+        """Пакетное удаление removeItemsN: алиасы d0..dN-1, ошибки по алиасу в errors с path."""
+        data, errors = {}, []
+        for index in range(len(variables)):
+            alias = f"d{index}"
+            try:
+                data[alias] = self.resolve_removeItem({"id": variables[f"id{index}"]})["removeItem"]
+            except LookupError as e:
+                data[alias] = None
+                errors.append({"message": str(e), "path": [alias]})
+        return data, errors
+
+    def execute(self, body):
+        """Выполнение GraphQL-запроса. Возвращает тело ответа (dict)."""
+        operation = body.get("operationName") or ""
+        variables = body.get("variables") or {}
+        persisted = (body.get("extensions") or {}).get("persistedQuery")
+        if persisted:
+            if "query" in body:
+                with self.lock:
+                    self.persisted_queries.add(persisted["sha256Hash"])
+            elif persisted["sha256Hash"] not in self.persisted_queries:
+                return {"errors": [{"message": "PersistedQueryNotFound",
+                                    "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"}}]}
+
+        if operation in MUTATIONS or operation.startswith("removeItems"):
+            if self.chance(self.retry_later_rate):
+                self.inject("retry_later")
+                return {"errors": [{"message": RETRY_LATER_TEXT}], "data": None}
+
+        if operation.startswith("removeItems"):
+            data, errors = self.resolve_batch_remove(variables)
+            return {"data": data, "errors": errors} if errors else {"data": data}
+
+        resolver = getattr(self, f"resolve_{operation}", None)
+        if resolver is None:
+            return {"errors": [{"message": f"Unknown operation '{operation}'"}]}
+        try:
+            return {"data": resolver(variables)}
+        except (KeyError, LookupError) as e:
+            return {"errors": [{"message": str(e), "path": [operation]}], "data": None}
+
+    def sell_page(self, title):
+        """HTML-заглушка страниц /sell и /products/<slug>/edit (с 'Попробуйте позже' по retry_later_rate)."""
+        message = ""
+        if self.chance(self.retry_later_rate):
+            self.inject("retry_later")
+            message = f"<div>{RETRY_LATER_TEXT}</div>"
+        return f"<!DOCTYPE html><html><head><title>{title}</title></head><body><h1>{title}</h1>{message}</body></html>"
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def log_message(self, format, *args):
+        # Журнал каждого запроса искажал бы замеры и засорял вывод
+        pass
+
+    def request_size(self, body):
+        return len(self.requestline) + sum(len(key) + len(value) + 4 for key, value in self.headers.items()) + len(body)
+
+    def send(self, status, payload, content_type="application/json", headers=None):
+        body = payload if isinstance(payload, bytes) else payload.encode('utf-8')
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body) + 150
+
+    def read_body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def throttled(self):
+        """Ответ 429 или 403 по заданной доле запросов. Возвращает размер ответа или None."""
+        if self.state.chance(self.state.rate_429):
+            self.state.inject("429")
+            return self.send(429, json.dumps({"errors": [{"message": "Too Many Requests"}]}),
+                             headers={"Retry-After": "1"})
+        if self.state.chance(self.state.rate_403):
+            self.state.inject("403")
+            return self.send(403, "<html><body>Access denied</body></html>", "text/html")
+        return None
+
+    def parse_graphql(self, body):
+        """Тело GraphQL-запроса: JSON или поле operations multipart-запроса с файлом."""
+        content_type = self.headers.get("Content-Type", "")
+        if content_type.startswith("multipart/form-data"):
+            message = BytesParser(policy=default_policy).parsebytes(
+                f"Content-Type: {content_type}\r\n\r\n".encode('utf-8') + body)
+            for part in message.iter_parts():
+                if part.get_param("name", header="content-disposition") == "operations":
+                    return json.loads(part.get_content())
+            raise ValueError("Нет поля operations")
+        return json.loads(body or b"{}")
+
+    def do_POST(self):
+        body = self.read_body()
+        if self.path == "/__reset":
+            self.state.reset_stats()
+            self.send(200, "{}")
+            return
+        if self.path != "/graphql":
+            self.send(404, "{}")
+            return
+
+        self.state.delay()
+        try:
+            request = self.parse_graphql(body)
+        except ValueError as e:
+            sent = self.send(400, json.dumps({"errors": [{"message": str(e)}]}))
+            self.state.count("invalid", self.request_size(body), sent)
+            return
+
+        sent = self.throttled()
+        if sent is None:
+            sent = self.send(200, json.dumps(self.state.execute(request), ensure_ascii=False))
+        self.state.count(request.get("operationName") or "unknown", self.request_size(body), sent)
+
+    def do_GET(self):
+        body = self.read_body()
+        if self.path == "/__stats":
+            with self.state.lock:
+                stats = json.dumps(self.state.stats)
+            self.send(200, stats)
+            return
+
+        self.state.delay()
+        path = self.path.split("?")[0].rstrip("/")
+        sent = self.throttled()
+        if sent is None:
+            if path == "/sell":
+                sent = self.send(200, self.state.sell_page("Продать"), "text/html")
+            elif path.startswith("/products/") and path.endswith("/edit"):
+                sent = self.send(200, self.state.sell_page("Редактирование"), "text/html")
+            elif path in ("", "/profile") or path.startswith("/products/"):
+                sent = self.send(200, "<!DOCTYPE html><html><body>playerok</body></html>", "text/html")
+            else:
+                sent = self.send(404, "<html><body>Not found</body></html>", "text/html")
+        self.state.count(f"GET {path.split('/')[1] if path else '/'}", self.request_size(body), sent)
+
+
+class MockServer:
+    """Локальный playerok на свободном порту в фоновом потоке: with MockServer(state) as server: server.url"""
+
+    def __init__(self, state=None, host="127.0.0.1", port=0):
+        self.state = state or MockPlayerok()
+        self.httpd = ThreadingHTTPServer((host, port), MockHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = self.state
+        self.thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="mock-playerok", daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Локальный playerok для бенчмарков.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--rate-429", type=float, default=0.0)
+    parser.add_argument("--rate-403", type=float, default=0.0)
+    parser.add_argument("--retry-later", type=float, default=0.0)
+    parser.add_argument("--items", type=int, default=0, help="карточек пользователя при запуске")
+    args = parser.parse_args()
+
+    state = MockPlayerok(args.latency, rate_429=args.rate_429, rate_403=args.rate_403,
+                         retry_later_rate=args.retry_later)
+    server = MockServer(state, port=args.port)
+    state.seed_items(args.items, "Game")
+    print(f"PLAYEROK_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.httpd.server_close()
@@ -0,0 +1,267 @@
+"""Бенчмарк создания и удаления карточек на локальном playerok (bench/mock_server.py).
+
+Запуск из корня проекта:
+    python -m bench.run_bench create --cards 60 --workers 3 --latency 0.05
+    python -m bench.run_bench delete --cards 500 --workers 2 --rate-429 0.02 --json logs/bench.json
+    python -m bench.run_bench create --baseline logs/bench.json
+
+Отчет: карточек в секунду, запросов и байт на карточку, память каждого процесса.
+С --baseline результат сравнивается с сохраненным, при ухудшении больше --tolerance код выхода 1.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+import urllib.request
+
+from bench.mock_server import MockPlayerok, MockServer
+
+try:
+    import resource
+except ImportError:
+    # Windows: пиковая память процесса недоступна
+    resource = None
+
+
+def max_rss_mb():
+    """Пиковая память текущего процесса в МБ или None."""
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux возвращает килобайты, macOS — байты
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def create_worker(tasks, options):
+    """Создание карточек через CreateReqManager. Возвращает количество созданных без ошибок ни на одном шаге."""
+    from managers.attachment_cache import AttachmentCache
+    from managers.config import config_store
+    from managers.create_req_manager import CreateReqManager
+    from managers.metrics import metrics
+
+    config = config_store.snapshot()
+    create_mng = CreateReqManager(cookies_file=options["cookies_file"])
+    # Отдельный кэш, чтобы бенчмарк не подставлял id картинок локального сервера в рабочий кэш
+    create_mng.attachment_cache = AttachmentCache(cache_file=os.path.join(options["temp_dir"], f"{os.getpid()}.json"))
+    done = 0
+    try:
+        for section_number, section_name, card, server_name in tasks:
+            start = time.monotonic()
+            create_mng.create_card(section_number, section_name, card, config.product_data,
+                                   config.virt_description(section_name), server_name)
+            metrics.observe_card(time.monotonic() - start, ok=not create_mng.last_failure,
+                                 reason=create_mng.last_failure)
+            done += not create_mng.last_failure
+    finally:
+        create_mng.close()
+    return done
+
+
+def delete_worker(card_ids, options):
+    """Удаление карточек пакетами через DeleteReqManager. Возвращает количество удаленных."""
+    from managers.delete_req_manager import DeleteReqManager
+
+    delete_mng = DeleteReqManager(cookies_file=options["cookies_file"])
+    try:
+        results = delete_mng.delete_cards_batched(card_ids, options["batch_size"], options["max_workers"])
+    finally:
+        delete_mng.close()
+    return sum(1 for success, _ in results.values() if success)
+
+
+SCENARIOS = {"create": create_worker, "delete": delete_worker}
+
+
+def run_worker(scenario, tasks, options, result_queue, log_queue):
+    """Процесс бенчмарка: выполняет свою часть задач и отправляет замеры в result_queue."""
+    from managers.log_setup import configure_worker
+    from managers.metrics import metrics
+    from managers.rate_limiter import default_limiter
+
+    configure_worker(log_queue)
+    metrics.reset()
+    if options["rate"]:
+        default_limiter.rate = default_limiter.max_rate = options["rate"]
+
+    result = {"worker": multiprocessing.current_process().name, "tasks": len(tasks), "done": 0, "error": None}
+    start = time.monotonic()
+    try:
+        result["done"] = SCENARIOS[scenario](tasks, options)
+    except Exception as e:
+        logging.exception(f"Ошибка процесса бенчмарка: {e}")
+        result["error"] = str(e)
+    result["seconds"] = round(time.monotonic() - start, 3)
+    result["max_rss_mb"] = max_rss_mb()
+    result["metrics"] = metrics.export()
+    result_queue.put(result)
+
+
+def build_create_tasks(config, section_number, section_name, cards_count, multi_server):
+    """cards_count задач (номер раздела, папка, карточка, сервер) по кругу из пресетов раздела."""
+    servers = config.servers(section_number) if multi_server else [None]
+    variants = [(card, server_name) for card in config.cards(section_name) for server_name in servers]
+    if not variants:
+        raise ValueError(f"В разделе '{section_name}' нет карточек.")
+    return [(section_number, section_name) + variants[index % len(variants)] for index in range(cards_count)]
+
+
+def fetch_stats(url):
+    with urllib.request.urlopen(f"{url}/__stats") as response:
+        return json.loads(response.read())
+
+
+def build_report(args, stats, results, seconds):
+    from managers.metrics import Metrics
+
+    merged = Metrics()
+    for result in results:
+        merged.merge(result["metrics"])
+    done = sum(result["done"] for result in results)
+    per_card = max(done, 1)
+    return {
+        "scenario": args.scenario,
+        "workers": args.workers,
+        "latency": args.latency,
+        "cards": done,
+        "failed": args.cards - done,
+        "seconds": round(seconds, 3),
+        "cards_per_second": round(done / seconds, 3) if seconds > 0 else 0.0,
+        "requests_per_card": round(stats["requests"] / per_card, 2),
+        "bytes_per_card": round((stats["bytes_in"] + stats["bytes_out"]) / per_card),
+        "memory_mb": {result["worker"]: result["max_rss_mb"] for result in results},
+        "operations": stats["operations"],
+        "injected": stats["injected"],
+        "steps": merged.summary()["steps"],
+        "failure_reasons": merged.summary()["failure_reasons"],
+        "errors": [result["error"] for result in results if result["error"]],
+    }
+
+
+def print_report(report):
+    print(f"Сценарий: {report['scenario']}, процессов: {report['workers']}, задержка: {report['latency']} с")
+    print(f"Карточек: {report['cards']} (с ошибкой {report['failed']}) за {report['seconds']} с")
+    print(f"Карточек в секунду: {report['cards_per_second']}")
+    print(f"Запросов на карточку: {report['requests_per_card']}")
+    print(f"Байт на карточку: {report['bytes_per_card']}")
+    for worker, memory in report["memory_mb"].items():
+        print(f"Память {worker}: {memory if memory is not None else '—'} МБ")
+    print(f"Запросы по операциям: {report['operations']}")
+    if report["injected"]:
+        print(f"Внесенные ошибки: {report['injected']}")
+    if report["failure_reasons"]:
+        print(f"Причины ошибок: {report['failure_reasons']}")
+    for error in report["errors"]:
+        print(f"Ошибка процесса: {error}")
+
+
+def compare_with_baseline(report, baseline_path, tolerance):
+    """Список ухудшений относительно сохраненного отчета (строки)."""
+    with open(baseline_path, 'r', encoding='utf-8') as file:
+        baseline = json.load(file)
+    regressions = []
+    # (показатель, больше — лучше)
+    for key, higher_is_better in (("cards_per_second", True), ("requests_per_card", False),
+                                  ("bytes_per_card", False)):
+        old, new = baseline.get(key), report[key]
+        if not old:
+            continue
+        change = (new - old) / old
+        if (higher_is_better and change < -tolerance) or (not higher_is_better and change > tolerance):
+            regressions.append(f"{key}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Бенчмарк создания и удаления карточек на локальном playerok.")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--cards", type=int, default=50, help="количество карточек")
+    parser.add_argument("--workers", type=int, default=2, help="количество процессов")
+    parser.add_argument("--section", type=int, default=2, help="номер раздела (как в data/game_names.json)")
+    parser.add_argument("--chips", default="arizona", help="папка раздела в chips")
+    parser.add_argument("--multi-server", action="store_true", help="карточка на каждый сервер раздела")
+    parser.add_argument("--batch-size", type=int, default=25)
+    parser.add_argument("--max-workers", type=int, default=5, help="одновременных запросов удаления")
+    parser.add_argument("--rate", type=float, help="фиксированная частота запросов процесса, запр/с")
+    parser.add_argument("--latency", type=float, default=0.05, help="задержка ответа сервера, с")
+    parser.add_argument("--latency-jitter", type=float, default=0.0)
+    parser.add_argument("--rate-429", type=float, default=0.0, help="доля ответов 429")
+    parser.add_argument("--rate-403", type=float, default=0.0, help="доля ответов 403")
+    parser.add_argument("--retry-later", type=float, default=0.0, help="доля ответов 'Попробуйте позже'")
+    parser.add_argument("--page-size", type=int, default=24, help="наибольший размер страницы items")
+    parser.add_argument("--seed", type=int, help="seed случайных ошибок сервера")
+    parser.add_argument("--json", metavar="PATH", help="сохранить отчет в JSON")
+    parser.add_argument("--baseline", metavar="PATH", help="сравнить с сохраненным отчетом")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="допустимое ухудшение (доля)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    state = MockPlayerok(args.latency, args.latency_jitter, args.rate_429, args.rate_403, args.retry_later,
+                         args.page_size, seed=args.seed)
+    server = MockServer(state).start()
+    # Адрес сайта читается при импорте managers.config, поэтому задается до импорта менеджеров
+    os.environ["PLAYEROK_URL"] = server.url
+
+    from managers.config import config_store
+    from managers.log_setup import get_log_queue, setup_logging
+
+    setup_logging(log_file="logs/bench.log")
+    config = config_store.snapshot()
+    state.server_labels = [server_name for servers in config.server_names.values() for server_name in servers]
+
+    temp_dir = tempfile.mkdtemp(prefix="playerok_bench_")
+    cookies_file = os.path.join(temp_dir, "cookies.json")
+    with open(cookies_file, 'w', encoding='utf-8') as file:
+        json.dump([{"name": "token", "value": "bench"}], file)
+    options = {"cookies_file": cookies_file, "temp_dir": temp_dir, "rate": args.rate,
+               "batch_size": args.batch_size, "max_workers": args.max_workers}
+
+    if args.scenario == "create":
+        tasks = build_create_tasks(config, args.section, args.chips, args.cards, args.multi_server)
+    else:
+        tasks = state.seed_items(args.cards, config.game_names.get(str(args.section), "Game"))
+    state.reset_stats()
+
+    result_queue = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=run_worker, name=f"worker_{index}",
+                                       args=(args.scenario, tasks[index::args.workers], options, result_queue,
+                                             get_log_queue()))
+               for index in range(args.workers)]
+    start = time.monotonic()
+    for worker in workers:
+        worker.start()
+    results = []
+    while len(results) < len(workers):
+        try:
+            results.append(result_queue.get(timeout=5))
+        except queue.Empty:
+            if not any(worker.is_alive() for worker in workers):
+                break
+    seconds = time.monotonic() - start
+    for worker in workers:
+        worker.join()
+
+    report = build_report(args, fetch_stats(server.url), results, seconds)
+    server.stop()
+    print_report(report)
+
+    if args.json:
+        os.makedirs(os.path.dirname(args.json) or ".", exist_ok=True)
+        with open(args.json, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=4)
+    if args.baseline:
+        regressions = compare_with_baseline(report, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f"Ухудшение: {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,94 +1,26 @@
-import multiprocessing
+import argparse
 import json
-import random
 import time
-from selenium.common import NoSuchElementException
+from selenium.common import TimeoutException
 from selenium.webdriver import Keys
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 import os
 import sys
-from functools import wraps
 import logging
 
-from auth.auth_manager import AuthManager
-from managers.delete_req_manager import DeleteReqManager
-
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("logs/automation.log", encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-
-def retry_on_message(max_retries=5, base_delay=10, message="попробуйте позже"):
-    def decorator(func):
-        @wraps(func)
-        def wrapper(self, wait, *args, **kwargs):
-            attempt = 1
-            while attempt <= max_retries:
-                try:
-                    func(self, wait, *args, **kwargs)
-
-                    # После успешного выполнения шага проверяем наличие сообщения
-                    if self.check_retry_message():
-                        raise Exception(message)
-
-                    return  # Успешное выполнение, выход из функции
-                except Exception as e:
-                    if message in str(e).lower():
-                        delay = base_delay * attempt
-                        print(
-                            f"Попытка {attempt} из {max_retries}: Получено сообщение '{message}'. Ожидание {delay} секунд перед повторной попыткой.")
-                        time.sleep(delay)
-                        attempt += 1
-                    else:
-                        raise  # Если ошибка не связана с сообщением, пробрасываем её дальше
-            print(f"Достигнуто максимальное количество попыток ({max_retries}) для метода '{func.__name__}'. Пропуск.")
-
-        return wrapper
-
-    return decorator
-
-
-def retry_on_exception(max_retries=5, base_delay=10, backoff_factor=2):
-    """
-    Декоратор для повторной попытки выполнения метода при возникновении любого исключения.
-
-    :param max_retries: Максимальное количество повторных попыток.
-    :param base_delay: Базовая задержка перед повторной попыткой в секундах.
-    :param backoff_factor: Фактор увеличения задержки для экспоненциального роста.
-    """
-
-    def decorator(func):
-        @wraps(func)
-        def wrapper(self, wait, *args, **kwargs):
-            attempt = 1
-            delay = base_delay
-            while attempt <= max_retries:
-                try:
-                    func(self, wait, *args, **kwargs)
-                    logging.info(f"Шаг '{func.__name__}' выполнен успешно с попытки {attempt}.")
-                    return  # Успешное выполнение, выходим из функции
-                except Exception as e:
-                    logging.warning(f"Попытка {attempt} из {max_retries} для шага '{func.__name__}' не удалась: {e}")
-                    if attempt == max_retries:
-                        logging.error(
-                            f"Достигнуто максимальное количество попыток ({max_retries}) для шага '{func.__name__}'. Пропуск шага.")
-                        raise  # Пробрасываем исключение дальше после исчерпания попыток
-                    logging.info(f"Ожидание {delay} секунд перед повторной попыткой.")
-                    time.sleep(delay)
-                    delay *= backoff_factor  # Увеличиваем задержку
-                    attempt += 1
-
-        return wrapper
-
-    return decorator
+from managers.asset_store import AssetStore
+from managers.browser_pool import BrowserPool
+from managers.config import BASE_URL, ConfigError, config_store
+from managers.create_req_manager import CreateReqManager
+from managers.delete_req_manager import DeleteReqManager, ItemsListingError
+from managers.job_journal import JobJournal
+from managers.log_setup import log_context, setup_logging
+from managers.metrics import metrics
+from managers.preflight import check_sections
+from managers.retry_policy import RateLimited, RetryPolicy
+from managers.sync_manager import SyncManager
 
 
 class PlayerokAutomation:
@@ -105,193 +37,216 @@ class PlayerokAutomation:
         10: "rodina",
         11: "amazing"
     }
+    # Разделы, где карточка выставляется отдельно на каждый сервер из data/server_names.json
+    MULTI_SERVER_SECTIONS = [1, 5]
+
+    # Повторы отдельного шага формы: сайт ответил "Попробуйте позже" или элемент не появился
+    STEP_POLICY = RetryPolicy(max_attempts=4, base_delay=2, max_delay=30, rate_limit_delay=20,
+                              fatal_errors=(FileNotFoundError, ConfigError))
+    # Повторы всей формы /sell (страница открывается заново) и изменения цены на /edit
+    SELL_POLICY = RetryPolicy(max_attempts=3, base_delay=10, max_delay=60, rate_limit_delay=30,
+                              fatal_errors=(FileNotFoundError, ConfigError))
+    CARD_TIME_BUDGET = 10 * 60  # Время на выставление карточки на одном сервере, в секундах
+    POLL_INTERVAL = 0.25  # Интервал опроса состояния страницы в ожиданиях
+    RETRY_MESSAGE_XPATH = "//div[contains(text(), 'Попробуйте позже')]"
+    EXHIBIT_BUTTON_XPATH = "//button[@type='button' and text()='Выставить бесплатно на 30 дней']"
+    # Запись завершенных GraphQL-запросов страницы: [название операции, успешен ли ответ].
+    # Операция берется из operationName тела fetch/XHR (или из текста query), ответ с errors — неуспешный
+    TRACK_REQUESTS_SCRIPT = """
+        if (!window.__requestTracker) {
+            const tracker = window.__requestTracker = {completed: []};
+            const parse = text => {
+                try {
+                    const data = JSON.parse(text);
+                    return Array.isArray(data) ? data : [data];
+                } catch (e) {
+                    return [];
+                }
+            };
+            const operations = body => parse(typeof body === 'string' ? body : '').map(item => item && (
+                item.operationName || ((item.query || '').match(/(?:mutation|query)\\s+(\\w+)/) || [])[1]) || '');
+            const hasErrors = text => parse(text).some(item => item && item.errors);
+            const record = (names, ok) => names.forEach(name => tracker.completed.push([name, ok]));
+
+            const originalFetch = window.fetch;
+            window.fetch = function (input, init) {
+                const names = operations(init && init.body);
+                return originalFetch.apply(this, arguments).then(response => {
+                    response.clone().text().then(text => record(names, response.ok && !hasErrors(text)),
+                                                 () => record(names, response.ok));
+                    return response;
+                }, error => {
+                    record(names, false);
+                    throw error;
+                });
+            };
+            const originalSend = XMLHttpRequest.prototype.send;
+            XMLHttpRequest.prototype.send = function (body) {
+                const names = operations(body);
+                this.addEventListener('loadend', () => {
+                    const text = ['', 'text'].includes(this.responseType) ? this.responseText : '';
+                    record(names, this.status >= 200 && this.status < 300 && !hasErrors(text));
+                });
+                return originalSend.apply(this, arguments);
+            };
+        }
+        window.__requestTracker.completed = [];
+    """
+    COMPLETED_REQUESTS_SCRIPT = "return window.__requestTracker ? window.__requestTracker.completed : [];"
 
-    MAX_RETRIES = 100  # Максимальное количество попыток
-    BASE_DELAY = 20  # Базовая задержка в секундах для повторных попыток
-
-    def __init__(self, section_number, card, product_data, virt_description, auth_manager):
+    def __init__(self, section_number, card, config, auth_manager, server_name="", throttle=None):
         self.section_number = section_number
         self.section_name = self.SECTION_MAPPING.get(section_number)
-        self.full_section_name = self.load_section_names()
+        self.config = config
+        self.full_section_name = config.game_names
         self.card = card
-        self.product_data = product_data
-        self.virt_description = virt_description
+        self.product_data = config.product_data
+        self.virt_description = config.virt_description(self.section_name)
         self.auth_manager = auth_manager
+        self.asset_store = AssetStore()
         self.url = ""
-        self.server_name = ""
-
-    def load_section_names(self):
-        """Загрузка полных названий секций из JSON-файла."""
-        try:
-            with open('data/game_names.json', 'r', encoding='utf-8') as json_file:
-                return json.load(json_file)
-        except FileNotFoundError:
-            logging.error("Файл 'game_names.json' не найден.")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            logging.error(f"Ошибка при чтении JSON из 'game_names.json': {e}")
-            sys.exit(1)
-
-    def load_servers_names(self, server_name):
-        """Загрузка полных названий серверов из JSON-файла."""
-        try:
-            with open('data/server_names.json', 'r', encoding='utf-8') as json_file:
-                data = json.load(json_file)
-                return data[server_name]
-        except FileNotFoundError:
-            logging.error("Файл 'server_names.json' не найден.")
-            sys.exit(1)
-        except json.JSONDecodeError as e:
-            logging.error(f"Ошибка при чтении JSON из 'server_names.json': {e}")
-            sys.exit(1)
+        self.server_name = server_name
+        self.deadline = None
+        self.throttle = throttle
 
     def start_sell(self):
-        """Разделяем сервера на группы по 10 и запускаем обработку для каждой группы"""
-        if self.section_number in [1, 5]:
-            servers = self.load_servers_names(self.full_section_name.get(str(self.section_number)))
-
-            # Разбиваем сервера на группы по 10
-            server_items = list(servers.items())
-            server_groups = [server_items[i:i + 10] for i in range(0, len(server_items), 10)]
-
-            for group_num, server_group in enumerate(server_groups, start=1):
-                logging.info(f"Запуск группы {group_num} из {len(server_groups)}")
-                self.auth_manager = AuthManager()  # Открываем новый браузер
-                self.auth_manager.login()  # Выполняем вход
-
-                for server_num, server_name in server_group:
-                    self.server_name = server_name
-                    self.url = ""
-                    self.initial_actions()
-
-                self.auth_manager.close()  # Закрываем браузер после обработки 10 серверов
-                logging.info(f"Группа {group_num} завершена и браузер закрыт.")
+        """Выставление карточки. Для игр с несколькими серверами без указанного сервера —
+        по очереди на все сервера в текущем браузере."""
+        if self.section_number in self.MULTI_SERVER_SECTIONS and not self.server_name:
+            for server_name in self.config.servers(self.section_number):
+                self.server_name = server_name
+                self.url = ""
+                self.initial_actions()
+            self.server_name = ""
         else:
             self.initial_actions()
 
     def initial_actions(self):
-        """Выполнение действий на странице продажи."""
-        url = "https://playerok.com/sell"
-        try:
-            self.auth_manager.driver.get(url)
-        except Exception as e:
-            logging.error(f"Не удалось открыть страницу продажи: {e}")
-            self.retry_entire_sell()
-            return
+        """Выставление карточки на текущий сервер.
 
-        # Ожидание загрузки страницы
-        wait = WebDriverWait(self.auth_manager.driver, 35)
+        Каждый шаг формы повторяется отдельно (STEP_POLICY). Если форма так и не прошла, страница /sell
+        открывается заново (SELL_POLICY), но после выставления повторяется только изменение цены,
+        чтобы не создать дубликат карточки. На все отводится CARD_TIME_BUDGET секунд.
+        """
+        self.deadline = time.monotonic() + self.CARD_TIME_BUDGET
+        self.url = ""
+        wait = WebDriverWait(self.auth_manager.driver, 35, poll_frequency=self.POLL_INTERVAL)
 
-        # Выбор секции
-        if not self.select_section(wait):
-            logging.error(f"Раздел {self.section_number} не выбран. Завершение работы.")
-            return
-        else:
-            logging.info(f"Раздел {self.section_number} выбран.")
+        self.SELL_POLICY.run("sell", self.sell, wait, deadline=self.deadline, throttle=self.throttle)
+        self.SELL_POLICY.run("discount", self.set_discount, wait, deadline=self.deadline, throttle=self.throttle)
+
+        logging.info(f"Карточка '{self.card['name']}' успешно обработана.")
+
+    def step(self, name, func, *args):
+        """Выполнение шага формы с повторами в пределах времени карточки."""
+        return self.STEP_POLICY.run(name, func, *args, deadline=self.deadline, throttle=self.throttle)
+
+    def sell(self, wait):
+        """Заполнение формы /sell до выставления карточки."""
+        self.auth_manager.driver.get(f"{BASE_URL}/sell")
+
+        self.step("select_section", self.select_section, wait)
+        logging.info(f"Раздел {self.section_number} выбран.")
 
         self.fill_common_fields(wait)
 
-        logging.info(f"Карточка '{self.card['name']}' успешно обработана.")
+    def set_discount(self, wait):
+        """Установка цены со скидкой на странице /edit уже выставленной карточки."""
+        self.navigate_edit_and_other_page()
+        self.step("fill_dprice_field", self.fill_dprice_field, wait)
+
+    def check_retry_message(self, timeout=0):
+        """Проверка наличия сообщения 'Попробуйте позже' на странице.
 
-    def check_retry_message(self):
-        """Проверка наличия сообщения 'Попробуйте позже' на странице."""
+        По умолчанию проверка не блокирует: смотрим только текущее состояние DOM.
+        """
         try:
-            # Используем точный XPath для обнаружения сообщения
-            retry_message = WebDriverWait(self.auth_manager.driver, 5).until(
-                EC.presence_of_element_located(
-                    (By.XPATH, "//div[contains(text(), 'Попробуйте позже')]")
+            if timeout:
+                WebDriverWait(self.auth_manager.driver, timeout, poll_frequency=self.POLL_INTERVAL).until(
+                    EC.presence_of_element_located((By.XPATH, self.RETRY_MESSAGE_XPATH))
                 )
-            )
+            elif not self.auth_manager.driver.find_elements(By.XPATH, self.RETRY_MESSAGE_XPATH):
+                return False
             logging.info("Сообщение 'Попробуйте позже' обнаружено.")
             return True
-        except:
-            logging.info("Сообщение 'Попробуйте позже' не обнаружено.")
+        except TimeoutException:
             return False
 
-    def retry_entire_sell(self):
-        """Механизм повторных попыток открытия страницы продажи."""
-        attempt = 1
-        while attempt <= self.MAX_RETRIES:
-            delay = self.BASE_DELAY * (2 ** (attempt - 1))  # Экспоненциальная задержка
-            logging.info(
-                f"Попытка {attempt} из {self.MAX_RETRIES}: Повторный запуск процесса продажи через {delay} секунд.")
-            time.sleep(delay)
-            try:
-                self.initial_actions()
-                return  # Если успешно, выходим
-            except Exception as e:
-                logging.error(f"Попытка {attempt}: Ошибка при повторном запуске процесса продажи: {e}")
-                attempt += 1
-        logging.error(
-            f"Достигнуто максимальное количество попыток ({self.MAX_RETRIES}) для карточки '{self.card['name']}'. Пропуск.")
+    def track_requests(self):
+        """Начало отслеживания запросов страницы; вызывается перед действием, запрос которого нужно дождаться."""
+        self.auth_manager.driver.execute_script(self.TRACK_REQUESTS_SCRIPT)
+
+    def wait_for_save(self, operation="updateItem", timeout=15):
+        """Ожидание ответа на запрос сохранения operation после track_requests.
+
+        Другие запросы страницы к /graphql (загрузка данных, аналитика) не считаются. Выбрасывает
+        TimeoutException, если ответа не было за timeout секунд или сайт ответил ошибкой.
+        """
+        def saved(driver):
+            results = [ok for name, ok in driver.execute_script(self.COMPLETED_REQUESTS_SCRIPT) if name == operation]
+            return results or False
 
-    def select_section(self, wait):
-        """Выбор раздела на странице продажи на основе номера секции."""
         try:
-            if not self.section_name:
-                logging.error(f"Неверный номер секции: {self.section_number}")
-                return False
+            results = WebDriverWait(self.auth_manager.driver, timeout, poll_frequency=self.POLL_INTERVAL).until(saved)
+        except TimeoutException:
+            raise TimeoutException(f"Запрос {operation} не завершился за {timeout} секунд.")
+        if not results[-1]:
+            raise TimeoutException(f"Запрос {operation} завершился ошибкой.")
 
-            full_section_name = self.full_section_name.get(str(self.section_number))
-            logging.info(f"Полное название секции: {full_section_name}")
-            # Найти поле ввода и ввести section_name
-            search_input = wait.until(
-                EC.visibility_of_element_located((By.CSS_SELECTOR, "input[name='search']"))
-            )
-            search_input.clear()  # Очистка поля ввода, если необходимо
-            search_input.send_keys(self.section_name)  # Ввод section_name
-            search_input.send_keys(Keys.RETURN)  # Отправка формы, если нужно
+    def select_section(self, wait):
+        """Выбор раздела на странице продажи на основе номера секции."""
+        if not self.section_name:
+            raise ConfigError(f"Неверный номер секции: {self.section_number}")
+
+        full_section_name = self.full_section_name.get(str(self.section_number))
+        logging.info(f"Полное название секции: {full_section_name}")
+        # Найти поле ввода и ввести section_name
+        search_input = wait.until(
+            EC.visibility_of_element_located((By.CSS_SELECTOR, "input[name='search']"))
+        )
+        search_input.clear()  # Очистка поля ввода, если необходимо
+        search_input.send_keys(self.section_name)  # Ввод section_name
+        search_input.send_keys(Keys.RETURN)  # Отправка формы, если нужно
 
-            # Ожидание появления и клика по элементу секции
-            paragraph = wait.until(
-                EC.element_to_be_clickable((By.XPATH, f"//p[text()='{full_section_name}']"))
-            )
-            paragraph.click()
-            return True
-        except Exception as e:
-            logging.error(f"Ошибка при выборе раздела: {e}")
-            return False
+        # Ожидание появления и клика по элементу секции
+        paragraph = wait.until(
+            EC.element_to_be_clickable((By.XPATH, f"//p[text()='{full_section_name}']"))
+        )
+        paragraph.click()
 
-    @retry_on_message(max_retries=5, base_delay=20, message="попробуйте позже")
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
-    def click_submit_button(self, wait, max_attempts=10, delay=2):
-        """Нажатие кнопки отправки формы с циклической проверкой ее активности."""
+    def click_submit_button(self, wait, timeout=20):
+        """Нажатие кнопки отправки формы, как только она станет активной."""
         xpath = "//button[@type='submit']"
-        attempt = 0
-        while attempt < max_attempts:
-            but_submit = self.auth_manager.driver.find_element(By.XPATH, xpath)
-            if but_submit.is_enabled() and not but_submit.get_attribute("disabled"):
-                self.auth_manager.driver.execute_script("arguments[0].click();", but_submit)
-                logging.info("Кнопка 'Далее' нажата успешно.")
-                return
-            else:
-                logging.info(
-                    f"Кнопка 'Далее' неактивна. Попытка {attempt + 1}/{max_attempts}. Ждем {delay} секунд.")
 
-            time.sleep(delay)
-            attempt += 1
+        def enabled_submit(driver):
+            buttons = driver.find_elements(By.XPATH, xpath)
+            if buttons and buttons[0].is_enabled() and not buttons[0].get_attribute("disabled"):
+                return buttons[0]
+            return False
 
+        try:
+            but_submit = WebDriverWait(self.auth_manager.driver, timeout, poll_frequency=self.POLL_INTERVAL).until(
+                enabled_submit)
+            self.auth_manager.driver.execute_script("arguments[0].click();", but_submit)
+            logging.info("Кнопка 'Далее' нажата успешно.")
+        except TimeoutException:
+            # Кнопка могла остаться неактивной из-за ограничения сайта; в любом случае шаг повторится целиком
+            if self.check_retry_message():
+                raise RateLimited("Сайт ответил 'Попробуйте позже'.")
+            raise TimeoutException(f"Кнопка 'Далее' не стала активной за {timeout} секунд.")
+
+        # Шаг, в котором нажата кнопка, повторится целиком
         if self.check_retry_message():
-            print("Получено сообщение 'попробуйте позже'.")
-            raise Exception("попробуйте позже")
+            raise RateLimited("Сайт ответил 'Попробуйте позже'.")
 
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_pic(self, wait):
         """Загрузка картинок."""
-        # Получение абсолютного пути к изображению
-        image_filename = f"{self.card['amount']}.jpg"
-        relative_image_path = os.path.join("chips", self.section_name, "pictures", image_filename)
-        absolute_image_path = os.path.abspath(relative_image_path)
-
-        # Проверка существования файла
-        if not os.path.isfile(absolute_image_path):
-            image_filename = f"{self.card['amount']}.png"
-            relative_image_path = os.path.join("chips", self.section_name, "pictures", image_filename)
-            absolute_image_path = os.path.abspath(relative_image_path)
-
-            if not os.path.isfile(absolute_image_path):
-                logging.error(f"Файл изображения не найден: {absolute_image_path}")
-                raise FileNotFoundError(f"Файл изображения не найден: {absolute_image_path}")
+        # Получение абсолютного пути к подготовленному изображению из хранилища
+        absolute_image_path = self.asset_store.find_picture(self.section_name, self.card['amount'])
+        if not absolute_image_path:
+            logging.error(f"Файл изображения не найден: {self.section_name}/{self.card['amount']}")
+            raise FileNotFoundError(f"Файл изображения не найден: {self.section_name}/{self.card['amount']}")
+        image_filename = os.path.basename(absolute_image_path)
 
         upload_input = wait.until(
             EC.presence_of_element_located((By.XPATH, "//input[@type='file' and @accept='image/*']"))
@@ -303,7 +258,6 @@ class PlayerokAutomation:
 
         self.click_submit_button(wait)
 
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_pname_field(self, wait):
         """Заполнение поля названия."""
         name_input = wait.until(
@@ -316,7 +270,6 @@ class PlayerokAutomation:
 
         self.click_submit_button(wait)
 
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_description_field(self, wait):
         """Заполнение поля Описание."""
         desc_input = wait.until(
@@ -328,12 +281,8 @@ class PlayerokAutomation:
 
         self.click_submit_button(wait)
 
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_price_field(self, wait):
         """Заполнение поля цены."""
-        if self.url and self.auth_manager.driver.current_url != self.url:
-            self.auth_manager.driver.get(self.url)
-
         price_input = wait.until(
             EC.presence_of_element_located((By.XPATH, "//input[@name='price']"))
         )
@@ -343,8 +292,6 @@ class PlayerokAutomation:
 
         self.click_submit_button(wait)
 
-    @retry_on_message(max_retries=5, base_delay=20, message="попробуйте позже")
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_product_data(self, wait):
         """Заполнение полей данных продукта."""
         if self.section_number == 1:
@@ -374,47 +321,47 @@ class PlayerokAutomation:
 
         self.click_submit_button(wait)
 
-        if self.check_retry_message():
-            print("Получено сообщение 'попробуйте позже'.")
-            raise Exception("попробуйте позже")
-
-    def check_button(self):
+    def check_button(self, timeout=0):
+        """Проверка наличия кнопки 'Выставить бесплатно на 30 дней', с ожиданием до timeout секунд."""
         try:
-            # Ищем кнопку с указанными атрибутами
-            button = self.auth_manager.driver.find_element(By.XPATH,
-                                                           "//button[@type='button' and text()='Выставить бесплатно на 30 дней']")
+            WebDriverWait(self.auth_manager.driver, timeout, poll_frequency=self.POLL_INTERVAL).until(
+                EC.presence_of_element_located((By.XPATH, self.EXHIBIT_BUTTON_XPATH))
+            )
             return True  # Кнопка найдена
-        except NoSuchElementException:
+        except TimeoutException:
             return False  # Кнопка не найдена
 
     def transition_exh(self, wait):
-        while True:
-            time.sleep(10)
+        """Выставление карточки. Если кнопка не появилась, данные продукта отправляются заново и шаг повторяется."""
+        # Кнопка появляется после перехода формы на шаг выставления
+        if not self.check_button(timeout=10):
+            self.fill_product_data(wait)
+            raise TimeoutException("Кнопка 'Выставить бесплатно на 30 дней' не появилась.")
+        self.exhibit_card(wait)
 
-            if self.check_button():
-                self.exhibit_card(wait)
-                break  # Выходим из цикла
-            else:
-                self.fill_product_data(wait)
-                time.sleep(5)  # Пауза перед повторной проверкой (опционально)
-
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def exhibit_card(self, wait):
         """Выставление карточки."""
         exhibit_button = wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, "//button[@type='button' and text()='Выставить бесплатно на 30 дней']"))
+            EC.element_to_be_clickable((By.XPATH, self.EXHIBIT_BUTTON_XPATH))
         )
         exhibit_button.click()
         logging.info("Кнопка 'Выставить бесплатно на 30 дней' нажата.")
-        # После клика декоратор проверит наличие исключения и выполнит повтор, если необходимо
 
-    def navigate_edit_and_other_page(self):
-        """Добавление /edit к текущему URL и переход на другую страницу."""
+    def remember_product_url(self):
+        """Запоминание адреса выставленной карточки: с ним изменение цены повторяется без повторного выставления."""
+        # После выставления страница уходит с /sell на страницу товара
+        try:
+            WebDriverWait(self.auth_manager.driver, 10, poll_frequency=self.POLL_INTERVAL).until(
+                lambda driver: "/products/" in driver.current_url
+            )
+        except TimeoutException:
+            logging.info("Переход на страницу товара не дождались, используем текущий URL.")
         self.url = self.auth_manager.driver.current_url
-        time.sleep(2)
+
+    def navigate_edit_and_other_page(self):
+        """Добавление /edit к адресу карточки и переход на страницу редактирования."""
         try:
-            current_url = self.auth_manager.driver.current_url
+            current_url = self.url
             if current_url.endswith('/status'):
                 edit_url = current_url.replace('/status', '/edit')
             else:
@@ -427,32 +374,42 @@ class PlayerokAutomation:
             logging.info(f"Переход на страницу: {edit_url}")
         except Exception as e:
             logging.error(f"Ошибка при навигации: {e}")
-            raise  # Пробрасываем исключение для обработки декоратором
+            raise  # Пробрасываем исключение для повтора по SELL_POLICY
 
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_dprice_field(self, wait):
         """Заполнение поля скидки."""
-        time.sleep(2)
         price_input = wait.until(
-            EC.presence_of_element_located((By.XPATH, "//input[@name='price']"))
+            EC.element_to_be_clickable((By.XPATH, "//input[@name='price']"))
         )
         price_input.clear()
         price_input.send_keys(str(self.card["price"]))
         logging.info(f"Поле скидки заполнено значением '{self.card['price']}'.")
 
+        self.track_requests()
         self.click_submit_button(wait)
-        time.sleep(5)
+        # Ждем, пока запрос сохранения завершится, прежде чем закрывать страницу; иначе шаг повторится
+        self.wait_for_save()
 
-    @retry_on_exception(max_retries=5, base_delay=20, backoff_factor=2)
     def fill_common_fields(self, wait):
-        """Заполнение общих полей формы."""
+        """Заполнение общих полей формы по шагам и выставление карточки."""
+        self.step("choose_category", self.choose_category, wait)
+        self.step("fill_pic", self.fill_pic, wait)
+        self.step("fill_pname_field", self.fill_pname_field, wait)
+        self.step("fill_description_field", self.fill_description_field, wait)
+        self.step("fill_price_field", self.fill_price_field, wait)
+        self.step("fill_product_data", self.fill_product_data, wait)
+        self.step("transition_exh", self.transition_exh, wait)
+        self.remember_product_url()
+
+    def choose_category(self, wait):
+        """Выбор категории 'Вирты', сервера и количества виртов."""
         but_virt = wait.until(
             EC.element_to_be_clickable((By.XPATH, "//span[text()='Вирты']"))
         )
         but_virt.click()
         logging.info("Кнопка 'Вирты' нажата.")
 
-        if self.section_number in [1, 5]:
+        if self.section_number in self.MULTI_SERVER_SECTIONS:
             self.choose_server_click(wait, self.server_name)
             self.input_virt_count(wait, "amount")
             self.click_submit_button(wait)
@@ -464,16 +421,6 @@ class PlayerokAutomation:
             self.input_virt_count(wait, "chips")
             self.click_submit_button(wait)
 
-        self.fill_pic(wait)
-        self.fill_pname_field(wait)
-        self.fill_description_field(wait)
-        self.fill_price_field(wait)
-        self.fill_product_data(wait)
-        self.transition_exh(wait)
-
-        self.navigate_edit_and_other_page()
-        self.fill_dprice_field(wait)
-
     def choose_server_click(self, wait, server):
         """Выбор сервера и клик по кнопке 'Далее'."""
         choose_server = wait.until(
@@ -496,25 +443,47 @@ class PlayerokAutomation:
         logging.info(f"Поле Количества виртов заполнено значением '{self.card['amount']}'.")
 
 
-def run_bot_for_card(section_number, card, product_data, virt_description, delay=0):
-    """Функция для запуска бота с возможной задержкой и обработкой ошибок"""
-    if delay > 0:
-        logging.info(f"Задержка перед запуском карточки '{card['name']}' на {delay:.2f} секунд.")
-        time.sleep(delay)  # Задержка перед началом
+def process_card(auth_manager, config, section_number, card, server_name="", throttle=None):
+    """Обработка одной карточки (на одном сервере) в уже авторизованном браузере процесса пула.
 
-    auth_manager = AuthManager()
-    bot = PlayerokAutomation(section_number, card, product_data, virt_description, auth_manager)
-    try:
-        auth_manager.login()
+    config — снимок ConfigSnapshot из основного процесса, файлы данных в процессе пула не читаются.
+    throttle — FleetThrottle пула для общей паузы после 'Попробуйте позже'.
+    """
+    with log_context(section=section_number, server=server_name or None, card=card['name']):
+        bot = PlayerokAutomation(section_number, card, config, auth_manager, server_name, throttle)
         bot.start_sell()
-    except Exception as e:
-        logging.error(f"Общая ошибка при обработке карточки '{card['name']}': {e}")
-    finally:
-        auth_manager.close()
+    return card['name']
 
 
-def create_cards():
-    # Отображение меню выбора раздела
+class SharedManagers:
+    """Менеджеры запросов одного запуска: все шаги используют общие cookies, пул соединений и кэш игр."""
+
+    def __init__(self):
+        self.client = None
+        self.create_mng = None
+        self.delete_mng = None
+
+    @property
+    def create(self):
+        if self.create_mng is None:
+            self.create_mng = CreateReqManager(client=self.client)
+            self.client = self.create_mng.client
+        return self.create_mng
+
+    @property
+    def delete(self):
+        if self.delete_mng is None:
+            self.delete_mng = DeleteReqManager(client=self.client)
+            self.client = self.delete_mng.client
+        return self.delete_mng
+
+    def close(self):
+        if self.client is not None:
+            self.client.close()
+
+
+def ask_section():
+    """Выбор одного раздела. Возвращает {номер раздела: папка в chips}."""
     print("Выберите раздел для обработки:")
     for num, name in PlayerokAutomation.SECTION_MAPPING.items():
         print(f"{num}. {name}")
@@ -527,104 +496,563 @@ def create_cards():
     except ValueError:
         print("Пожалуйста, введите корректный номер раздела.")
         sys.exit(1)
+    return {section_number: PlayerokAutomation.SECTION_MAPPING[section_number]}
 
-    # Путь к файлу с карточками выбранного раздела
-    section_name = PlayerokAutomation.SECTION_MAPPING[section_number]
-    card_file = f'chips/{section_name}/presets.json'
-    desc_file = 'data/descriptions.json'
 
-    # Загрузка описания из JSON-файла
+def ask_sections(title):
+    """Выбор одного раздела или всех разделов. Возвращает {номер раздела: папка в chips}."""
+    print(title)
+    print("0. Все разделы")
+    for num, name in PlayerokAutomation.SECTION_MAPPING.items():
+        print(f"{num}. {name}")
+
     try:
-        with open(desc_file, 'r', encoding='utf-8') as f:
-            descriptions_file = json.load(f)
+        section_number = int(input("Введите номер раздела: "))
+        if section_number != 0 and section_number not in PlayerokAutomation.SECTION_MAPPING:
+            print("Неверный номер раздела.")
+            sys.exit(1)
+    except ValueError:
+        print("Пожалуйста, введите корректный номер раздела.")
+        sys.exit(1)
 
-        # Извлекаем описание для выбранного сервера
-        virt_description = descriptions_file["descriptions"].get(section_name, {}).get("virt_description", "")
-        product_data = descriptions_file["product_data"]["text"]
+    if section_number == 0:
+        return dict(PlayerokAutomation.SECTION_MAPPING)
+    return {section_number: PlayerokAutomation.SECTION_MAPPING[section_number]}
 
-    except FileNotFoundError:
-        logging.error(f"Файл {desc_file} не найден.")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        logging.error(f"Ошибка при чтении JSON из файла {desc_file}: {e}")
-        sys.exit(1)
 
-    # Загрузка карточек из JSON-файла
-    try:
-        with open(card_file, 'r', encoding='utf-8') as f:
-            cards = json.load(f)
-    except FileNotFoundError:
-        logging.error(f"Файл {card_file} не найден.")
-        sys.exit(1)
-    except json.JSONDecodeError as e:
-        logging.error(f"Ошибка при чтении JSON из файла {card_file}: {e}")
-        sys.exit(1)
+def ask_confirm(question):
+    answer = input(f"{question} (y/n): ")
+    return answer.strip().lower() in ("y", "yes", "д", "да")
 
-    if not cards:
-        logging.error(f"Файл {card_file} пуст.")
-        sys.exit(1)
 
-    # Настройка multiprocessing.Pool
-    max_processes = 3  # Максимальное количество параллельных процессов
+def section_servers(config, section_number, servers=None):
+    """Сервера, на которых создаются карточки раздела. servers ограничивает список серверов."""
+    if section_number not in PlayerokAutomation.MULTI_SERVER_SECTIONS:
+        return [""]
+    server_names = config.servers(section_number)
+    if servers:
+        server_names = [server_name for server_name in server_names if server_name in servers]
+    return server_names
+
+
+def create_cards(sections=None, mode=None, servers=None, resume=None, dry_run=False, max_processes=3,
+                 cards_per_browser=10, managers=None):
+    """Создание карточек разделов. Не переданные параметры запрашиваются у пользователя.
+
+    Задания всех разделов выполняются одним менеджером запросов или одним пулом браузеров,
+    поэтому вход и соединения общие для всех игр запуска.
+
+    :param sections: Словарь {номер раздела: папка в chips}.
+    :param mode: 'requests' — через GraphQL-запросы, 'browser' — через браузеры.
+    :param servers: Названия серверов, на которых создавать карточки (по умолчанию — на всех).
+    :param resume: True — продолжить незавершенный запуск, False — начать новый, None — спросить.
+    :param dry_run: Только вывести задания, ничего не создавая.
+    :param max_processes: Количество процессов пула (браузеров), работающих параллельно.
+    :param cards_per_browser: Через сколько карточек (или серверов одной карточки) браузер перезапускается.
+    :param managers: SharedManagers для работы нескольких шагов с одним входом.
+    """
+    if sections is None:
+        sections = ask_section()
 
-    with multiprocessing.Pool(processes=max_processes) as pool:
-        for index, card in enumerate(cards):
-            # Добавление случайной задержки (например, до 10 секунд) для каждого задания
-            delay = random.uniform(1, 15)
-            pool.apply_async(run_bot_for_card, args=(section_number, card, product_data, virt_description, delay))
+    if mode is None:
+        print("Выберите способ создания:\n1. Запросы (без браузера)\n2. Браузер")
+        try:
+            mode = {1: "requests", 2: "browser"}.get(int(input("Введите номер способа: ")))
+            if mode is None:
+                print("Неверный номер способа.")
+                sys.exit(1)
+        except ValueError:
+            print("Пожалуйста, введите корректный номер способа.")
+            sys.exit(1)
 
-        pool.close()
-        pool.join()
+    config = config_store.snapshot()
+    preflight(config, sections)
+
+    # Журнал запуска: при повторном запуске после сбоя выполняются только незавершенные задания.
+    # Для игр с несколькими серверами каждая пара (карточка, сервер) — отдельная задача,
+    # поэтому сервера одной карточки обрабатываются параллельно в разных браузерах.
+    # При dry_run журнал не открывается: пробный запуск не должен оставлять незавершенных запусков
+    journal = None if dry_run else JobJournal()
+    run_ids = []
+    tasks = []
+    interrupted = []
+    for section_number, section_name in sections.items():
+        cards = config.cards(section_name)
+        if not cards:
+            raise ConfigError(f"Файл chips/{section_name}/presets.json пуст.")
+        run_id = None if dry_run else open_run(journal, "create", section_name, resume)
+        run_ids.append(run_id)
+
+        section_tasks = 0
+        for card in cards:
+            for server_name in section_servers(config, section_number, servers):
+                key = JobJournal.card_key(section_name, server_name, card)
+                task = (run_id, key, section_number, section_name, card, server_name)
+                if journal is not None:
+                    journal.add(run_id, key, section_name, server_name, card)
+                    status = journal.status(run_id, key)
+                    if status == JobJournal.DONE:
+                        continue
+                    if status == JobJournal.IN_PROGRESS:
+                        interrupted.append(task)
+                        continue
+                tasks.append(task)
+                section_tasks += 1
+        if not dry_run:
+            logging.info(f"Запуск {run_id} ({section_name}): заданий к выполнению {section_tasks}")
+
+    if dry_run:
+        for run_id, key, section_number, section_name, card, server_name in tasks:
+            print(f"+ {section_name} {server_name} {card['name']}: {card['price']}")
+        return
+
+    if interrupted:
+        tasks.extend(check_interrupted(journal, interrupted, managers))
+
+    if mode == "requests":
+        create_mng = managers.create if managers else CreateReqManager()
+        for run_id, key, section_number, section_name, card, server_name in tasks:
+            journal.start(run_id, key)
+            start = time.monotonic()
+            with log_context(section=section_number, server=server_name or None, card=card['name']):
+                item = create_mng.create_card(section_number, section_name, card, config.product_data,
+                                              config.virt_description(section_name), server_name or None)
+            # Карточка без цены со скидкой уже выставлена: в журнале она выполнена, чтобы повтор не создал
+            # дубликат, а в метриках — неудачна с причиной update_item_price
+            metrics.observe_card(time.monotonic() - start, ok=not create_mng.last_failure,
+                                 reason=create_mng.last_failure)
+            if item:
+                journal.done(run_id, key, item['slug'])
+            else:
+                journal.fail(run_id, key, f"Карточка не создана: {create_mng.last_failure}")
+        if not managers:
+            create_mng.close()
+    else:
+        # Пул процессов, каждый со своим браузером, который переиспользуется для нескольких карточек
+        task_keys = {}
+        with BrowserPool(process_card, processes=max_processes, cards_per_browser=cards_per_browser) as pool:
+            for run_id, key, section_number, section_name, card, server_name in tasks:
+                journal.start(run_id, key)
+                task_id = pool.submit(config, section_number, card, server_name)
+                task_keys[task_id] = (run_id, key)
+            results = pool.join()
+
+        for task_id, (run_id, key) in task_keys.items():
+            success, result = results.get(task_id, (False, "Процесс пула завершился до выполнения задания"))
+            if success:
+                journal.done(run_id, key, result)
+            else:
+                journal.fail(run_id, key, result)
+                logging.error(f"Задание {key} не выполнено: {result}")
 
+    for run_id in run_ids:
+        finish_run(journal, run_id)
+    journal.close()
     logging.info("Все процессы завершены.")
 
 
-def delete_cards():
+def preflight(config, sections):
+    """Проверка пресетов, картинок, серверов и описаний до запуска. При проблемах — ConfigError со всеми сразу."""
+    problems = check_sections(config, AssetStore(), sections, PlayerokAutomation.MULTI_SERVER_SECTIONS)
+    if problems:
+        raise ConfigError("Проверка данных не пройдена:\n" + "\n".join(problems))
+    logging.info(f"Проверка данных пройдена, разделов: {len(sections)}")
+
+
+def ask_resume(journal, kind, scope):
+    """id незавершенного запуска, если пользователь решил его продолжить, иначе None."""
+    run_id = journal.find_unfinished_run(kind, scope)
+    if run_id is not None:
+        if ask_confirm(f"Найден незавершенный запуск {run_id} ({journal.summary(run_id)}). Продолжить его?"):
+            return run_id
+    return None
+
+
+def find_resumable_run(journal, kind, scope, resume):
+    """id запуска для продолжения: resume=True — последний незавершенный, False — None, None — спросить."""
+    if resume is None:
+        return ask_resume(journal, kind, scope)
+    if resume:
+        return journal.find_unfinished_run(kind, scope)
+    return None
+
+
+def open_run(journal, kind, scope, resume):
+    """Продолжаемый или новый запуск."""
+    return find_resumable_run(journal, kind, scope, resume) or journal.start_run(kind, scope)
+
+
+def finish_run(journal, run_id):
+    """Итог запуска в журнале."""
+    if journal.finish_run_if_complete(run_id):
+        logging.info(f"Запуск {run_id} завершен полностью.")
+    else:
+        logging.warning(f"Запуск {run_id} завершен не полностью: {journal.summary(run_id)}. "
+                        f"Его можно продолжить при следующем запуске.")
+
+
+def check_interrupted(journal, interrupted, managers=None):
+    """Проверка заданий создания, прерванных на середине (in_progress): карточка могла успеть появиться.
+
+    Задания сверяются с карточками на сайте по (раздел, сервер, название, исходная цена): найденные
+    отмечаются выполненными, остальные возвращаются для повторного создания. Если карточки загрузить
+    не удалось или сервер карточки с тем же названием неизвестен, задание пропускается до следующего
+    запуска, чтобы не создать дубликат.
+    """
+    logging.warning(f"Прерванных заданий создания: {len(interrupted)}, проверка карточек на сайте.")
+    shared = managers or SharedManagers()
+    try:
+        sync_mng = SyncManager(shared.create, shared.delete)
+        live = sync_mng.load_live({task[2]: task[3] for task in interrupted})
+    except ItemsListingError as e:
+        logging.error(f"Прерванные задания не проверены и пропущены до следующего запуска: {e}")
+        return []
+    finally:
+        if not managers:
+            shared.close()
+
+    retry = []
+    for task in interrupted:
+        run_id, key, section_number, section_name, card, server_name = task
+        same_name = [entry for entry in live
+                     if entry['section_number'] == section_number and entry['node']['name'] == card['name']]
+        match = next((entry for entry in same_name
+                      if not entry['unknown'] and (entry['server'] or "") == server_name
+                      and entry['node']['rawPrice'] == card['rawPrice']), None)
+        if match:
+            live.remove(match)
+            journal.done(run_id, key, match['node']['slug'])
+            logging.info(f"{section_name} {server_name} {card['name']}: карточка уже создана ({match['node']['slug']})")
+            if match['node']['price'] != card['price']:
+                logging.warning(f"{section_name} {server_name} {card['name']}: цена {match['node']['price']} "
+                                f"вместо {card['price']}, ее можно исправить через reprice.")
+        elif any(entry['unknown'] for entry in same_name):
+            logging.warning(f"{section_name} {server_name} {card['name']}: сервер карточки с таким названием "
+                            f"не определен, задание пропущено до следующего запуска.")
+        else:
+            retry.append(task)
+    return retry
+
+
+def delete_cards(games=None, resume=None, dry_run=False, batch_size=25, max_workers=5, managers=None):
+    """Удаление бесплатных карточек.
+
+    :param games: Полные названия игр, ALL_GAMES — карточки всех игр, None — выбор в меню.
+    :param resume: True — продолжить незавершенный запуск, False — начать новый, None — спросить.
+    :param dry_run: Только вывести карточки, ничего не удаляя.
+    """
     print("Ожидайте, идет загрузка доступных для удаления карточек.")
 
-    delete_mng = DeleteReqManager()
-    exist_free_cards = delete_mng.fetch_existing_cards()
+    delete_mng = managers.delete if managers else DeleteReqManager()
+    journal = JobJournal()
+    run_id = None if dry_run else find_resumable_run(journal, "delete", "cards", resume)
+    if run_id is not None:
+        # Продолжение прерванного удаления: список карточек берется из журнала
+        matching_keys = [job["key"] for job in journal.remaining(run_id)]
+        delete_journaled(delete_mng, journal, run_id, matching_keys, batch_size, max_workers)
+    else:
+        exist_free_cards = delete_mng.fetch_existing_cards()
+        matching_keys = select_cards_to_delete(exist_free_cards, games)
+
+        if dry_run:
+            for card_id in matching_keys:
+                print(f"- {exist_free_cards[card_id]} {card_id}")
+        elif matching_keys:
+            run_id = journal.start_run("delete", "cards")
+            for card_id in matching_keys:
+                journal.add(run_id, card_id, exist_free_cards[card_id])
+            delete_journaled(delete_mng, journal, run_id, matching_keys, batch_size, max_workers)
+        else:
+            print("Нет доступных для удаления карточек.")
+
+    journal.close()
+    if not managers:
+        delete_mng.close()
+
+
+def select_cards_to_delete(exist_free_cards, games=None):
+    """id карточек выбранных игр. games=None — выбор игры в меню."""
+    if not exist_free_cards:
+        return []
+    logging.info(f"Найденные бесплатные карточки: {exist_free_cards}")
+
+    if games == ALL_GAMES:
+        return list(exist_free_cards.keys())
+    if games is not None:
+        return [key for key, value in exist_free_cards.items() if value in games]
+
+    print("Выберите раздел для удаления относящихся к нему бесплатных карточек:")
+    print("0. Удалить всё")
 
-    if exist_free_cards:
-        logging.info(f"Найденные бесплатные карточки: {exist_free_cards}")
+    unique_cards = list(set(exist_free_cards.values()))
+    for i, value in enumerate(unique_cards, 1):
+        print(f"{i}. {value}")
 
-        print("Выберите раздел для удаления относящихся к нему бесплатных карточек:")
-        print("0. Удалить всё")
+    try:
+        section_number = int(input("Введите номер раздела: "))
+        if section_number not in range(0, len(unique_cards) + 1):
+            print("Неверный номер раздела.")
+            sys.exit(1)
+    except ValueError:
+        print("Пожалуйста, введите корректный номер раздела.")
+        sys.exit(1)
+
+    if section_number == 0:
+        return list(exist_free_cards.keys())
+    selected_value = unique_cards[section_number - 1]
+    # Находим все ключи, соответствующие выбранному значению
+    return [key for key, value in exist_free_cards.items() if value == selected_value]
 
-        unique_cards = list(set(exist_free_cards.values()))
-        for i, value in enumerate(unique_cards, 1):
-            print(f"{i}. {value}")
 
+def delete_journaled(delete_mng, journal, run_id, card_ids, batch_size=25, max_workers=5):
+    """Удаление карточек с записью результата каждой в журнал запуска"""
+    for card_id in card_ids:
+        journal.start(run_id, card_id)
+
+    results_deleting = delete_mng.delete_cards_batched(card_ids, batch_size, max_workers)
+    for card_id, (success, result) in results_deleting.items():
+        if success:
+            journal.done(run_id, card_id)
+        else:
+            journal.fail(run_id, card_id, result)
+        print(result)
+    finish_run(journal, run_id)
+
+
+def sync_cards(sections=None, dry_run=False, assume_yes=False, managers=None):
+    """Приведение бесплатных карточек к пресетам: создаются только недостающие, меняются цены, удаляются лишние."""
+    if sections is None:
+        sections = ask_sections("Выберите раздел для синхронизации:")
+
+    print("Ожидайте, идет сверка карточек.")
+    shared = managers or SharedManagers()
+    sync_mng = SyncManager(shared.create, shared.delete)
+
+    plan, _ = sync_mng.sync(sections, dry_run=True)
+    for entry in plan["create"]:
+        print(f"+ {entry['section_name']} {entry['server'] or ''} {entry['card']['name']}: {entry['card']['price']}")
+    for live_entry, entry in plan["update"]:
+        print(f"~ {entry['section_name']} {entry['server'] or ''} {entry['card']['name']}: "
+              f"{live_entry['node']['price']} -> {entry['card']['price']}")
+    for entry in plan["delete"]:
+        print(f"- {entry['section_name']} {entry['server'] or ''} {entry['node']['name']}")
+    for entry in plan["unknown"]:
+        print(f"? {entry['section_name']} {entry['node']['name']}: сервер не определен, карточка пропущена")
+
+    if not (plan["create"] or plan["update"] or plan["delete"]):
+        print("Карточки соответствуют пресетам.")
+    elif not dry_run and (assume_yes or ask_confirm("Применить изменения?")):
+        if plan["create"]:
+            preflight(sync_mng.config, {entry['section_number']: entry['section_name'] for entry in plan["create"]})
+        done = sync_mng.apply(plan)
+        logging.info(f"Синхронизация завершена: создано {done['create']}, цен изменено {done['update']}, "
+                     f"удалено {done['delete']}")
+
+    if not managers:
+        shared.close()
+
+
+def reprice_cards(sections=None, amount=None, dry_run=False, assume_yes=False, managers=None):
+    """Изменение цен существующих карточек по пресетам без удаления и повторного создания."""
+    if sections is None:
+        sections = ask_sections("Выберите раздел для изменения цен:")
+        amount = input("Введите количество виртов (пусто — все карточки раздела): ").strip()
         try:
-            section_number = int(input("Введите номер раздела: "))
-            if section_number not in range(0, len(unique_cards) + 1):
-                print("Неверный номер раздела.")
-                sys.exit(1)
+            amount = int(amount) if amount else None
         except ValueError:
-            print("Пожалуйста, введите корректный номер раздела.")
+            print("Пожалуйста, введите корректное количество.")
             sys.exit(1)
 
-        if section_number == 0:
-            matching_keys = list(exist_free_cards.keys())
+    print("Ожидайте, идет загрузка карточек.")
+    shared = managers or SharedManagers()
+    sync_mng = SyncManager(shared.create, shared.delete)
+
+    updates, _ = sync_mng.reprice(sections, amount, dry_run=True)
+    for live_entry, entry in updates:
+        print(f"~ {entry['section_name']} {entry['server'] or ''} {entry['card']['name']}: "
+              f"{live_entry['node']['price']} -> {entry['card']['price']}")
+
+    if not updates:
+        print("Цены карточек соответствуют пресетам.")
+    elif not dry_run and (assume_yes or ask_confirm("Изменить цены?")):
+        updated = sync_mng.apply_prices(updates)
+        logging.info(f"Изменено цен: {updated} из {len(updates)}")
+
+    if not managers:
+        shared.close()
+
+
+# Значение games для удаления карточек всех игр, включая игры не из data/game_names.json
+ALL_GAMES = "all"
+# Команды CLI и шагов файла заданий
+COMMANDS = ("check", "create", "delete", "sync", "reprice")
+
+
+def resolve_sections(games):
+    """{номер раздела: папка в chips} по списку папок или номеров разделов. Пустой список — все разделы."""
+    if not games:
+        return dict(PlayerokAutomation.SECTION_MAPPING)
+
+    by_name = {name: number for number, name in PlayerokAutomation.SECTION_MAPPING.items()}
+    sections = {}
+    for game in games:
+        game = str(game)
+        number = int(game) if game.isdigit() else by_name.get(game)
+        if number not in PlayerokAutomation.SECTION_MAPPING:
+            raise ValueError(f"Неизвестный раздел '{game}'. Доступные: {', '.join(by_name)}")
+        sections[number] = PlayerokAutomation.SECTION_MAPPING[number]
+    return sections
+
+
+def run_command(command, options, managers):
+    """Выполнение одной команды CLI или шага файла заданий с общими менеджерами."""
+    sections = resolve_sections(options.get("games"))
+    if command == "check":
+        preflight(config_store.snapshot(), sections)
+    elif command == "create":
+        create_cards(sections, options.get("mode", "requests"), options.get("servers"),
+                     options.get("resume", False), options.get("dry_run", False),
+                     options.get("processes", 3), options.get("cards_per_browser", 10), managers)
+    elif command == "delete":
+        if options.get("games"):
+            config = config_store.snapshot()
+            games = [config.game_name(number) for number in sections]
         else:
-            selected_value = unique_cards[section_number - 1]
-            # Находим все ключи, соответствующие выбранному значению
-            matching_keys = [key for key, value in exist_free_cards.items() if value == selected_value]
-
-        # отправка ссылок
-        results_deleting = delete_mng.delete_cards_parallel(matching_keys)
-        for result in results_deleting:
-            print(result)
-    else:
-        print("Нет доступных для удаления карточек.")
+            games = ALL_GAMES
+        delete_cards(games, options.get("resume", False), options.get("dry_run", False),
+                     options.get("batch_size", 25), options.get("max_workers", 5), managers)
+    elif command == "sync":
+        sync_cards(sections, options.get("dry_run", False), options.get("yes", False), managers)
+    elif command == "reprice":
+        reprice_cards(sections, options.get("amount"), options.get("dry_run", False), options.get("yes", False),
+                      managers)
+
+
+def load_job_file(path):
+    """Загрузка файла заданий (JSON или YAML): список шагов {"command": ..., параметры команды}."""
+    with open(path, 'r', encoding='utf-8') as file:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Для файлов заданий в формате YAML нужен пакет PyYAML (pip install pyyaml).")
+            job = yaml.safe_load(file)
+        else:
+            job = json.load(file)
+    steps = job.get("steps", []) if isinstance(job, dict) else job
+    if not isinstance(steps, list) or not all(isinstance(step, dict) and "command" in step for step in steps):
+        raise ValueError(f"Файл заданий {path} должен содержать список шагов с полем 'command'.")
+    return steps
+
+
+def parse_args(argv=None):
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--games", nargs="+", metavar="GAME",
+                        help="разделы (папки в chips или номера), по умолчанию — все")
+    common.add_argument("--dry-run", action="store_true", help="только показать изменения")
+
+    parser = argparse.ArgumentParser(description="Создание и удаление карточек на playerok.com.")
+    parser.add_argument("--metrics", default="logs/metrics.json", metavar="PATH",
+                        help="файл с итогами запуска в JSON (по умолчанию logs/metrics.json)")
+    parser.add_argument("--prometheus", metavar="PATH",
+                        help="файл с итогами запуска в текстовом формате Prometheus")
+    subparsers = parser.add_subparsers(dest="command")
+
+    subparsers.add_parser("check", parents=[common], help="проверка пресетов, картинок и описаний")
+
+    create_parser = subparsers.add_parser("create", parents=[common], help="создание карточек")
+    create_parser.add_argument("--mode", choices=["requests", "browser"], default="requests")
+    create_parser.add_argument("--servers", nargs="+", metavar="SERVER",
+                               help="сервера для игр с несколькими серверами, по умолчанию — все")
+    create_parser.add_argument("--processes", type=int, default=3, help="количество браузеров")
+    create_parser.add_argument("--cards-per-browser", type=int, default=10)
+    create_parser.add_argument("--resume", action="store_true", help="продолжить незавершенный запуск")
+
+    delete_parser = subparsers.add_parser("delete", parents=[common], help="удаление бесплатных карточек")
+    delete_parser.add_argument("--batch-size", type=int, default=25)
+    delete_parser.add_argument("--max-workers", type=int, default=5)
+    delete_parser.add_argument("--resume", action="store_true", help="продолжить незавершенный запуск")
+
+    sync_parser = subparsers.add_parser("sync", parents=[common], help="синхронизация карточек с пресетами")
+    sync_parser.add_argument("--yes", action="store_true", help="применить без подтверждения")
+
+    reprice_parser = subparsers.add_parser("reprice", parents=[common], help="изменение цен по пресетам")
+    reprice_parser.add_argument("--amount", type=int, help="только карточки с этим количеством виртов")
+    reprice_parser.add_argument("--yes", action="store_true", help="применить без подтверждения")
+
+    run_parser = subparsers.add_parser("run", help="выполнение шагов из файла заданий (JSON или YAML)")
+    run_parser.add_argument("job_file")
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    setup_logging()
+    if args.command is None:
+        try:
+            config_store.snapshot()
+            main_menu()
+        except (ConfigError, ItemsListingError) as e:
+            logging.error(e)
+            sys.exit(1)
+        finally:
+            write_metrics(args)
+        return
+
+    try:
+        if args.command == "run":
+            steps = load_job_file(args.job_file)
+        else:
+            options = {key: value for key, value in vars(args).items()
+                       if key not in ("command", "metrics", "prometheus")}
+            steps = [{"command": args.command, **options}]
+
+        # Ошибки в шагах и файлах данных выявляются до начала работы, а не после выполнения предыдущих шагов
+        config_store.snapshot()
+        for step in steps:
+            if step["command"] not in COMMANDS:
+                raise ValueError(f"Неизвестная команда '{step['command']}'. Доступные: {', '.join(COMMANDS)}")
+            resolve_sections(step.get("games"))
+    except (OSError, ValueError, ConfigError) as e:
+        logging.error(e)
+        sys.exit(1)
+
+    managers = SharedManagers()
+    try:
+        for step in steps:
+            step = dict(step)
+            run_command(step.pop("command"), step, managers)
+    except (ConfigError, ItemsListingError) as e:
+        logging.error(e)
+        sys.exit(1)
+    finally:
+        managers.close()
+        write_metrics(args)
+
+    print("Программа завершена.")
+
+
+def write_metrics(args):
+    """Итоги запуска: в лог, в JSON и, если указан файл, в формате Prometheus."""
+    if not metrics.cards and not metrics.steps and not metrics.step_failures:
+        return
+    metrics.log_summary()
+    try:
+        metrics.write_json(args.metrics)
+        if args.prometheus:
+            metrics.write_prometheus(args.prometheus)
+    except OSError as e:
+        logging.error(f"Не удалось сохранить метрики: {e}")
 
 
-def main():
-    print("Выберите действие:\n1. Создание карточек\n2. Удаление карточек")
+def main_menu():
+    print("Выберите действие:\n1. Создание карточек\n2. Удаление карточек\n3. Синхронизация карточек с пресетами\n"
+          "4. Изменение цен по пресетам")
 
     try:
         action = int(input("Введите номер действия: "))
-        if action not in [1, 2]:
+        if action not in [1, 2, 3, 4]:
             print("Неверный номер раздела.")
             sys.exit(1)
     except ValueError:
@@ -635,6 +1063,10 @@ def main():
         create_cards()
     elif action == 2:
         delete_cards()
+    elif action == 3:
+        sync_cards()
+    elif action == 4:
+        reprice_cards()
 
     print("Программа завершена.")
 
@@ -0,0 +1,128 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import sys
+
+
+class AssetStore:
+    """Хранилище картинок карточек с адресацией по содержимому.
+
+    Одинаковые картинки разных игр хранятся один раз: assets/pictures/originals/<sha256>.<ext>.
+    Подготовленные для загрузки версии (уменьшенные и пережатые) лежат в assets/pictures/prepared/<sha256>.jpg.
+    Индекс assets/index.json сопоставляет (игра, amount) с хешем картинки.
+    """
+
+    # Размер, до которого уменьшаются картинки: больше сайт в карточке не показывает
+    PREPARED_SIZE = (800, 450)
+    PREPARED_QUALITY = 85
+    EXTENSIONS = ("jpg", "png")
+
+    def __init__(self, root='assets', chips_dir='chips'):
+        self.root = root
+        self.chips_dir = chips_dir
+        self.originals_dir = os.path.join(root, "pictures", "originals")
+        self.prepared_dir = os.path.join(root, "pictures", "prepared")
+        self.index_file = os.path.join(root, "index.json")
+        self.index = self.load_index()
+
+    def load_index(self):
+        """Загрузка индекса {игра: {amount: имя файла в originals}}."""
+        if not os.path.isfile(self.index_file):
+            return {}
+        with open(self.index_file, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def save_index(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.index_file, 'w', encoding='utf-8') as file:
+            json.dump(self.index, file, ensure_ascii=False, indent=4, sort_keys=True)
+
+    @staticmethod
+    def file_hash(path):
+        sha256 = hashlib.sha256()
+        with open(path, 'rb') as file:
+            for chunk in iter(lambda: file.read(1024 * 1024), b""):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def ingest(self, remove_sources=False):
+        """Перенос картинок из chips/<игра>/pictures в хранилище. Возвращает количество новых файлов."""
+        os.makedirs(self.originals_dir, exist_ok=True)
+        added = 0
+        for game in sorted(os.listdir(self.chips_dir)):
+            pictures_dir = os.path.join(self.chips_dir, game, "pictures")
+            if not os.path.isdir(pictures_dir):
+                continue
+            for filename in sorted(os.listdir(pictures_dir)):
+                amount, extension = os.path.splitext(filename)
+                extension = extension.lstrip(".").lower()
+                if extension not in self.EXTENSIONS:
+                    continue
+
+                source_path = os.path.join(pictures_dir, filename)
+                stored_name = f"{self.file_hash(source_path)}.{extension}"
+                stored_path = os.path.join(self.originals_dir, stored_name)
+                if not os.path.isfile(stored_path):
+                    shutil.copyfile(source_path, stored_path)
+                    added += 1
+                self.index.setdefault(game, {})[amount] = stored_name
+
+                if remove_sources:
+                    os.remove(source_path)
+
+        self.save_index()
+        logging.info(f"В хранилище добавлено картинок: {added}")
+        return added
+
+    def prepare(self, force=False):
+        """Подготовка уменьшенных JPEG-версий всех картинок. Требуется Pillow."""
+        from PIL import Image
+
+        os.makedirs(self.prepared_dir, exist_ok=True)
+        prepared = 0
+        for stored_name in sorted(set(name for amounts in self.index.values() for name in amounts.values())):
+            prepared_path = self.prepared_path(stored_name)
+            if os.path.isfile(prepared_path) and not force:
+                continue
+
+            with Image.open(os.path.join(self.originals_dir, stored_name)) as image:
+                image = image.convert("RGBA")
+                # Прозрачные участки заливаем белым, JPEG не поддерживает альфа-канал
+                background = Image.new("RGB", image.size, (255, 255, 255))
+                background.paste(image, mask=image.getchannel("A"))
+                background.thumbnail(self.PREPARED_SIZE, Image.LANCZOS)
+                background.save(prepared_path, "JPEG", quality=self.PREPARED_QUALITY, optimize=True, progressive=True)
+            prepared += 1
+
+        logging.info(f"Подготовлено картинок: {prepared}")
+        return prepared
+
+    def prepared_path(self, stored_name):
+        return os.path.join(self.prepared_dir, f"{os.path.splitext(stored_name)[0]}.jpg")
+
+    def find_picture(self, game, amount):
+        """Путь к картинке для (игра, amount): подготовленная версия, оригинал из хранилища
+        или файл из chips/<игра>/pictures, если картинку еще не перенесли. None, если картинки нет."""
+        stored_name = self.index.get(game, {}).get(str(amount))
+        if stored_name:
+            for path in (self.prepared_path(stored_name), os.path.join(self.originals_dir, stored_name)):
+                if os.path.isfile(path):
+                    return os.path.abspath(path)
+
+        for extension in self.EXTENSIONS:
+            path = os.path.join(self.chips_dir, game, "pictures", f"{amount}.{extension}")
+            if os.path.isfile(path):
+                return os.path.abspath(path)
+        return None
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+    commands = sys.argv[1:] or ["ingest", "prepare"]
+    store = AssetStore()
+    if "ingest" in commands:
+        store.ingest(remove_sources="--remove-sources" in commands)
+    if "prepare" in commands:
+        store.prepare(force="--force" in commands)
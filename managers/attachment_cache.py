@@ -0,0 +1,58 @@
+import json
+import logging
+import os
+import time
+
+from managers.asset_store import AssetStore
+
+
+class AttachmentCache:
+    """Кэш загруженных на сервер картинок: хеш содержимого файла -> id файла на сервере.
+
+    Хранится на диске, чтобы одна и та же картинка загружалась один раз не только за запуск, но и между
+    запусками, пока запись не устарела.
+    """
+
+    def __init__(self, cache_file='data/attachments_cache.json', ttl=24 * 60 * 60):
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.entries = self.load()
+        self.hashes = {}
+
+    def load(self):
+        if not os.path.isfile(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as file:
+                return json.load(file)
+        except json.JSONDecodeError as e:
+            logging.error(f"Ошибка при чтении JSON из '{self.cache_file}': {e}. Кэш будет создан заново.")
+            return {}
+
+    def save(self):
+        # Пишем во временный файл и подменяем, чтобы прерванный запуск не оставил испорченный кэш
+        temp_file = f"{self.cache_file}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as file:
+            json.dump(self.entries, file, indent=4)
+        os.replace(temp_file, self.cache_file)
+
+    def content_hash(self, path):
+        if path not in self.hashes:
+            self.hashes[path] = AssetStore.file_hash(path)
+        return self.hashes[path]
+
+    def get(self, path):
+        """id ранее загруженного файла или None, если его нет или запись устарела."""
+        entry = self.entries.get(self.content_hash(path))
+        if entry and time.time() - entry['uploaded_at'] < self.ttl:
+            return entry['id']
+        return None
+
+    def put(self, path, file_id):
+        self.entries[self.content_hash(path)] = {"id": file_id, "uploaded_at": time.time()}
+        self.save()
+
+    def invalidate(self, path):
+        """Удаление записи, например если сервер больше не принимает сохраненный id."""
+        if self.entries.pop(self.content_hash(path), None) is not None:
+            self.save()
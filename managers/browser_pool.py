@@ -0,0 +1,165 @@
+import logging
+import multiprocessing
+import os
+import queue
+import time
+
+from auth.auth_manager import AuthManager
+from managers.fleet_throttle import FleetThrottle
+from managers.log_setup import configure_worker, get_log_queue
+from managers.metrics import metrics
+from managers.pacer import Pacer
+
+
+def browser_worker(handler, task_queue, result_queue, cards_per_browser, profile_dir, throttle, pacer,
+                   log_queue=None):
+    """Процесс пула: держит один авторизованный браузер и берет карточки из общей очереди.
+
+    Свободный процесс сразу забирает следующую задачу, поэтому процессы заняты, пока очередь не пуста.
+    Начала задач (и запуски браузеров) разносятся по времени общим Pacer.
+    Браузер пересоздается после cards_per_browser карточек, если он перестал отвечать или вышел из сессии.
+    При завершении процесс отправляет свои метрики сообщением (None, True, metrics.export()).
+    Записи лога отправляются в log_queue, в файл их пишет один процесс записи лога.
+    """
+    if log_queue is not None:
+        configure_worker(log_queue)
+    auth_manager = None
+    processed = 0
+    # Замеры, унаследованные от основного процесса при fork, не должны попасть в отчет дважды
+    metrics.reset()
+
+    try:
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            task_id, args = task
+
+            if auth_manager is not None and (processed >= cards_per_browser or not auth_manager.is_alive()):
+                logging.info(f"Перезапуск браузера после {processed} карточек.")
+                close_browser(auth_manager)
+                auth_manager = None
+
+            try:
+                pacer.wait_turn()
+                if auth_manager is None:
+                    with metrics.timer("login"):
+                        auth_manager = AuthManager(profile_dir=profile_dir)
+                        auth_manager.login()
+                    processed = 0
+                elif not auth_manager.is_logged_in():
+                    logging.info("Сессия истекла, повторная авторизация.")
+                    with metrics.timer("login"):
+                        auth_manager.login()
+
+                with throttle.slot():
+                    start = time.monotonic()
+                    try:
+                        result = handler(auth_manager, *args, throttle=throttle)
+                    except Exception as e:
+                        metrics.observe_card(time.monotonic() - start, ok=False, reason=type(e).__name__)
+                        raise
+                    metrics.observe_card(time.monotonic() - start)
+                throttle.on_success()
+                result_queue.put((task_id, True, result))
+            except Exception as e:
+                logging.error(f"Ошибка при обработке задачи {task_id}: {e}")
+                result_queue.put((task_id, False, str(e)))
+                # После сбоя браузер может быть в неизвестном состоянии — пересоздаем его
+                if auth_manager is not None and not auth_manager.is_alive():
+                    close_browser(auth_manager)
+                    auth_manager = None
+            processed += 1
+    finally:
+        close_browser(auth_manager)
+        result_queue.put((None, True, metrics.export()))
+
+
+def close_browser(auth_manager):
+    if auth_manager is None:
+        return
+    try:
+        auth_manager.close()
+    except Exception as e:
+        logging.error(f"Ошибка при закрытии браузера: {e}")
+
+
+class BrowserPool:
+    """Пул долгоживущих процессов, каждый со своим авторизованным браузером.
+
+    handler(auth_manager, *args, throttle=throttle) — функция верхнего уровня модуля (ее нужно передать
+    в процесс), вызывается для каждой задачи с уже авторизованным браузером процесса. throttle —
+    общий для процессов FleetThrottle: через него ограничение сайта, замеченное одним процессом,
+    приостанавливает все.
+    """
+
+    def __init__(self, handler, processes=3, cards_per_browser=20, start_interval=2.0,
+                 profiles_dir='data/chrome_profiles', throttle=None, pacer=None):
+        """
+        :param start_interval: Минимальный интервал между началами задач во всех процессах, в секундах.
+        """
+        self.handler = handler
+        self.throttle = throttle or FleetThrottle(processes)
+        self.pacer = pacer or Pacer(start_interval)
+        self.profiles_dir = profiles_dir
+        self.processes = processes
+        self.cards_per_browser = cards_per_browser
+        self.task_queue = multiprocessing.Queue()
+        self.result_queue = multiprocessing.Queue()
+        self.log_queue = get_log_queue()
+        self.workers = []
+        self.submitted = 0
+
+    def start(self):
+        for index in range(self.processes):
+            # У каждого процесса свой профиль: Chrome не позволяет открыть один профиль дважды
+            profile_dir = os.path.join(self.profiles_dir, f"worker_{index}") if self.profiles_dir else None
+            worker = multiprocessing.Process(
+                target=browser_worker, name=f"worker_{index}",
+                args=(self.handler, self.task_queue, self.result_queue, self.cards_per_browser, profile_dir,
+                      self.throttle, self.pacer, self.log_queue))
+            worker.start()
+            self.workers.append(worker)
+        return self
+
+    def submit(self, *args):
+        """Добавление задачи в очередь. Возвращает ее номер."""
+        task_id = self.submitted
+        self.task_queue.put((task_id, args))
+        self.submitted += 1
+        return task_id
+
+    def join(self):
+        """Ожидание выполнения всех задач. Возвращает {номер задачи: (успех, результат)}.
+
+        Метрики процессов пула добавляются в metrics основного процесса.
+        """
+        for _ in self.workers:
+            self.task_queue.put(None)
+
+        results = {}
+        finished = 0
+        while len(results) < self.submitted or finished < len(self.workers):
+            try:
+                task_id, success, result = self.result_queue.get(timeout=5)
+                if task_id is None:
+                    metrics.merge(result)
+                    finished += 1
+                else:
+                    results[task_id] = (success, result)
+            except queue.Empty:
+                if not any(worker.is_alive() for worker in self.workers):
+                    logging.error("Все процессы пула завершились, часть задач не выполнена.")
+                    break
+
+        for worker in self.workers:
+            worker.join()
+        return results
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        for worker in self.workers:
+            if worker.is_alive() and exc_type is not None:
+                worker.terminate()
@@ -0,0 +1,190 @@
+import json
+import logging
+import os
+import threading
+import time
+from types import MappingProxyType
+
+# Адрес сайта. Переменная окружения PLAYEROK_URL позволяет направить запросы и браузеры на другой сервер,
+# например на локальный bench/mock_server.py; процессы пула наследуют ее от основного процесса.
+BASE_URL = os.environ.get("PLAYEROK_URL", "https://playerok.com").rstrip("/")
+
+
+class ConfigError(Exception):
+    """Ошибка в файлах данных: файла нет, он не читается как JSON или не соответствует ожидаемой структуре."""
+
+
+def freeze(value):
+    """Неизменяемая копия JSON-значения: словари — MappingProxyType, списки — кортежи."""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Обычная изменяемая копия значения, замороженного freeze."""
+    if isinstance(value, MappingProxyType):
+        return {key: thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+def read_json(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        raise ConfigError(f"Файл {path} не найден.")
+    except json.JSONDecodeError as e:
+        raise ConfigError(f"Ошибка при чтении JSON из файла {path}: {e}")
+
+
+def check(condition, message):
+    if not condition:
+        raise ConfigError(message)
+
+
+def is_string_mapping(value):
+    return isinstance(value, dict) and all(isinstance(key, str) and isinstance(item, str)
+                                           for key, item in value.items())
+
+
+class ConfigSnapshot:
+    """Неизменяемый снимок файлов данных: названия игр, сервера, описания и пресеты карточек.
+
+    Снимок загружается и проверяется один раз и передается в процессы пула целиком, поэтому файлы
+    не перечитываются на каждую карточку, а ошибки в них выявляются до начала работы.
+    """
+
+    FIELDS = ("game_names", "server_names", "descriptions", "presets")
+
+    def __init__(self, game_names, server_names, descriptions, presets):
+        for name, value in zip(self.FIELDS, (game_names, server_names, descriptions, presets)):
+            object.__setattr__(self, name, freeze(value))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Снимок конфигурации нельзя изменять.")
+
+    def __getstate__(self):
+        # MappingProxyType не сериализуется pickle, поэтому в процессы пула передаются обычные словари
+        return {name: thaw(getattr(self, name)) for name in self.FIELDS}
+
+    def __setstate__(self, state):
+        ConfigSnapshot.__init__(self, **state)
+
+    def game_name(self, section_number):
+        """Полное название игры раздела (как на сайте)."""
+        return self.game_names[str(section_number)]
+
+    def servers(self, section_number):
+        """Названия серверов игры раздела из data/server_names.json."""
+        game_name = self.game_name(section_number)
+        if game_name not in self.server_names:
+            raise ConfigError(f"В data/server_names.json нет серверов для игры '{game_name}'.")
+        return list(self.server_names[game_name].values())
+
+    @property
+    def product_data(self):
+        return self.descriptions["product_data"]["text"]
+
+    def virt_description(self, section_name):
+        return self.descriptions["descriptions"].get(section_name, {}).get("virt_description", "")
+
+    def cards(self, section_name):
+        """Пресеты карточек раздела (изменяемые копии)."""
+        if section_name not in self.presets:
+            raise ConfigError(f"Файл chips/{section_name}/presets.json не найден.")
+        return thaw(self.presets[section_name])
+
+
+class ConfigStore:
+    """Загрузка снимка конфигурации с повторной загрузкой при изменении файлов.
+
+    snapshot() не чаще раза в check_interval секунд сверяет время изменения файлов и, если они
+    изменились, загружает новый снимок. Если в измененных файлах ошибка, остается прежний снимок.
+    """
+
+    def __init__(self, data_dir='data', chips_dir='chips', check_interval=2.0):
+        self.data_dir = data_dir
+        self.chips_dir = chips_dir
+        self.check_interval = check_interval
+        self.current = None
+        self.mtimes = None
+        self.checked = 0.0
+        self.lock = threading.Lock()
+
+    def files(self):
+        """Пути ко всем файлам, из которых собирается снимок."""
+        paths = [os.path.join(self.data_dir, name)
+                 for name in ("game_names.json", "server_names.json", "descriptions.json")]
+        if os.path.isdir(self.chips_dir):
+            for section_name in sorted(os.listdir(self.chips_dir)):
+                path = os.path.join(self.chips_dir, section_name, "presets.json")
+                if os.path.isfile(path):
+                    paths.append(path)
+        return paths
+
+    def get_mtimes(self):
+        return {path: os.path.getmtime(path) if os.path.exists(path) else None for path in self.files()}
+
+    def snapshot(self):
+        """Текущий снимок. Первая загрузка с ошибкой вызывает ConfigError."""
+        with self.lock:
+            if self.current is None:
+                self.mtimes = self.get_mtimes()
+                self.current = self.load()
+                self.checked = time.monotonic()
+            elif time.monotonic() - self.checked >= self.check_interval:
+                self.reload_if_changed()
+            return self.current
+
+    def reload_if_changed(self):
+        """Загрузка нового снимка, если файлы изменились. Возвращает True, если снимок заменен."""
+        self.checked = time.monotonic()
+        mtimes = self.get_mtimes()
+        if mtimes == self.mtimes:
+            return False
+        self.mtimes = mtimes
+        try:
+            self.current = self.load()
+        except ConfigError as e:
+            logging.error(f"Файлы данных изменены, но содержат ошибку, используются прежние данные: {e}")
+            return False
+        logging.info("Файлы данных изменены, конфигурация загружена заново.")
+        return True
+
+    def load(self):
+        game_names = read_json(os.path.join(self.data_dir, "game_names.json"))
+        check(is_string_mapping(game_names),
+              "data/game_names.json должен быть объектом {номер раздела: название игры}.")
+
+        server_names = read_json(os.path.join(self.data_dir, "server_names.json"))
+        check(isinstance(server_names, dict) and all(is_string_mapping(servers) for servers in server_names.values()),
+              "data/server_names.json должен быть объектом {название игры: {номер: название сервера}}.")
+
+        descriptions = read_json(os.path.join(self.data_dir, "descriptions.json"))
+        check(isinstance(descriptions, dict) and isinstance(descriptions.get("descriptions"), dict),
+              "В data/descriptions.json нет объекта 'descriptions'.")
+        check(isinstance(descriptions.get("product_data"), dict)
+              and isinstance(descriptions["product_data"].get("text"), str),
+              "В data/descriptions.json нет текста 'product_data.text'.")
+
+        presets = {}
+        for path in self.files()[3:]:
+            section_name = os.path.basename(os.path.dirname(path))
+            cards = read_json(path)
+            check(isinstance(cards, list), f"Файл {path} должен содержать список карточек.")
+            for index, card in enumerate(cards):
+                check(isinstance(card, dict) and isinstance(card.get("name"), str)
+                      and all(isinstance(card.get(field), int) for field in ("amount", "rawPrice", "price")),
+                      f"Карточка {index + 1} в {path} должна содержать name (строка), amount, rawPrice и price (числа).")
+            presets[section_name] = cards
+
+        return ConfigSnapshot(game_names, server_names, descriptions, presets)
+
+
+# Хранилище конфигурации, общее для всего процесса
+config_store = ConfigStore()
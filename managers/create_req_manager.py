@@ -0,0 +1,258 @@
+import asyncio
+import logging
+
+from managers.asset_store import AssetStore
+from managers.attachment_cache import AttachmentCache
+from managers.metrics import metrics
+from managers.req_manager import ReqManager
+
+
+class CreateReqManager(ReqManager):
+    """Создание карточек через GraphQL-запросы вместо заполнения формы /sell в браузере."""
+
+    CATEGORY_NAME = "Вирты"
+    # Разделы, где сервер выбирается из списка data/server_names.json
+    MULTI_SERVER_SECTIONS = [1, 5]
+    # Разделы, где выбирается вариант "Любой" сервер
+    ANY_SERVER_SECTIONS = [2]
+    # Поле количества виртов отличается у разных игр
+    AMOUNT_FIELDS = {1: "amount", 2: "amount", 5: "amount", 10: "chips"}
+    # Способ получения, который выбирается в форме (для остальных игр берется первый доступный)
+    OBTAINING_TYPE_NAMES = {1: "Перевод виртов через игровой банк (без входа в аккаунт)"}
+
+    def __init__(self, cookies_file='data/cookies_data.ckjson', client=None):
+        super().__init__(cookies_file, client=client)
+        self.full_section_name = self.load_section_names()
+        self.categories = {}
+        self.asset_store = AssetStore()
+        self.attachment_cache = AttachmentCache()
+        self.last_failure = None
+
+    def resolve_category(self, section_number):
+        """Получение категории 'Вирты' игры с ее опциями, способом получения и полями данных."""
+        if section_number in self.categories:
+            return self.categories[section_number]
+
+        game_name = self.full_section_name.get(str(section_number))
+        game = self.find_game(game_name)
+        if not game:
+            return None
+        categories = [category for category in game['categories'] if category['name'] == self.CATEGORY_NAME]
+        if not categories:
+            logging.error(f"Категория '{self.CATEGORY_NAME}' не найдена у игры '{game_name}'.")
+            return None
+        category_id = categories[0]['id']
+
+        data = self.build_request("gameCategory", {"id": category_id})
+        response_data = self.send_graphql(data)
+        if not response_data:
+            return None
+
+        options = response_data['gameCategory']['options']
+        obtaining_types = [edge['node'] for edge in response_data['gameCategoryObtainingTypes']['edges']]
+        obtaining_name = self.OBTAINING_TYPE_NAMES.get(section_number)
+        if obtaining_name:
+            obtaining_types = [node for node in obtaining_types if node['name'] == obtaining_name]
+        if not obtaining_types:
+            logging.error(f"Способ получения для игры '{game_name}' не найден.")
+            return None
+        obtaining_type_id = obtaining_types[0]['id']
+
+        data = self.build_request("gameCategoryDataFields", {
+            "filter": {"gameCategoryId": category_id, "obtainingTypeId": obtaining_type_id, "type": "ITEM_DATA"},
+            "pagination": {"first": 20}
+        })
+        response_data = self.send_graphql(data)
+        if response_data is None:
+            return None
+
+        self.categories[section_number] = {
+            "id": category_id,
+            "options": options,
+            "obtaining_type_id": obtaining_type_id,
+            "data_fields": [edge['node'] for edge in response_data['gameCategoryDataFields']['edges']],
+        }
+        return self.categories[section_number]
+
+    def build_attributes(self, section_number, category, card, server_name):
+        """Сбор атрибутов карточки: сервер и количество виртов."""
+        attributes = {}
+        if section_number in self.MULTI_SERVER_SECTIONS or section_number in self.ANY_SERVER_SECTIONS:
+            server_label = server_name if section_number in self.MULTI_SERVER_SECTIONS else "Любой"
+            options = [option for option in category['options'] if option['label'] == server_label]
+            if not options:
+                raise ValueError(f"Сервер '{server_label}' не найден в опциях категории.")
+            attributes[options[0]['field']] = options[0]['value']
+
+        amount_field = self.AMOUNT_FIELDS.get(section_number)
+        if amount_field:
+            attributes[amount_field] = card['amount']
+        return attributes
+
+    def get_attachment_id(self, image_path):
+        """id картинки на сервере: из кэша, если она уже загружалась, иначе картинка загружается.
+
+        Возвращает (id или None, взят ли id из кэша).
+        """
+        attachment_id = self.attachment_cache.get(image_path)
+        if attachment_id:
+            return attachment_id, True
+
+        attachment_id = self.upload_attachment(image_path)
+        if attachment_id:
+            self.attachment_cache.put(image_path, attachment_id)
+        return attachment_id, False
+
+    def upload_attachment(self, image_path):
+        """Загрузка картинки на сервер. Возвращает id файла."""
+        data = self.build_request("uploadFile", {"file": None})
+        response_data = self.send_graphql(data, files={"variables.file": image_path})
+        if not response_data:
+            return None
+        return response_data['uploadFile']['id']
+
+    def create_item(self, category, name, description, price, attributes, product_data, attachment_id):
+        """Создание черновика карточки."""
+        item_input = {
+            "gameCategoryId": category['id'],
+            "obtainingTypeId": category['obtaining_type_id'],
+            "name": name,
+            "description": description,
+            "price": price,
+            "attributes": attributes,
+            "attachmentIds": [attachment_id],
+        }
+        # Для игр с полями данных (Black Russia) текст передается в поле, для остальных — в комментарий
+        if category['data_fields']:
+            item_input["dataFields"] = [{"fieldId": category['data_fields'][0]['id'], "value": product_data}]
+        else:
+            item_input["comment"] = product_data
+
+        data = self.build_request("createItem", {"input": item_input})
+        response_data = self.send_graphql(data)
+        if not response_data:
+            return None
+        return response_data['createItem']
+
+    def publish_item_free(self, item_id, price):
+        """Выставление карточки бесплатно на 30 дней."""
+        data = self.build_request("itemPriorityStatuses", {"itemId": item_id, "price": price})
+        response_data = self.send_graphql(data)
+        if not response_data:
+            return False
+
+        free_statuses = [status for status in response_data['itemPriorityStatuses'] if status['price'] == 0]
+        if not free_statuses:
+            logging.error(f"Бесплатное размещение недоступно для карточки {item_id}.")
+            return False
+
+        data = self.build_request("publishItem", {
+            "input": {
+                "itemId": item_id,
+                "priorityStatuses": [free_statuses[0]['id']],
+                "transactionProviderId": "LOCAL",
+            }
+        })
+        return bool(self.send_graphql(data))
+
+    def update_item_price(self, item_id, price):
+        """Синхронная обертка над update_item_price_async."""
+        return self.client.run(self.update_item_price_async(item_id, price))
+
+    async def update_item_price_async(self, item_id, price):
+        """Установка цены со скидкой (аналог поля цены на странице /edit)."""
+        data = self.build_request("updateItem", {"input": {"id": item_id, "price": price}})
+        return bool(await self.send_graphql_async(data))
+
+    def reprice_cards(self, prices, max_workers=5):
+        """Синхронная обертка над reprice_cards_async."""
+        return self.client.run(self.reprice_cards_async(prices, max_workers))
+
+    async def reprice_cards_async(self, prices, max_workers=5):
+        """Изменение цен существующих карточек без пересоздания, не более max_workers запросов одновременно.
+
+        :param prices: Словарь {id карточки: новая цена}.
+        :return: Словарь {id карточки: успех}.
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def update(item_id, price):
+            async with semaphore:
+                return await self.update_item_price_async(item_id, price)
+
+        results = await asyncio.gather(*[update(item_id, price) for item_id, price in prices.items()])
+        return dict(zip(prices, results))
+
+    def create_card(self, section_number, section_name, card, product_data, virt_description, server_name=None):
+        """Создание одной карточки: картинка, черновик, бесплатное выставление и цена со скидкой.
+
+        Возвращает карточку или None. Шаг, на котором создание не удалось, сохраняется в last_failure
+        (None, если все шаги выполнены); карточка без цены со скидкой возвращается, но last_failure
+        равен "update_item_price".
+        """
+        self.last_failure = None
+        image_path = self.asset_store.find_picture(section_name, card['amount'])
+        if not image_path:
+            logging.error(f"Файл изображения для '{card['amount']}' в разделе '{section_name}' не найден.")
+            self.last_failure = "find_picture"
+            return None
+
+        category = self.resolve_category(section_number)
+        if not category:
+            self.last_failure = "resolve_category"
+            return None
+
+        try:
+            attributes = self.build_attributes(section_number, category, card, server_name)
+        except ValueError as e:
+            logging.error(f"Ошибка при заполнении атрибутов карточки '{card['name']}': {e}")
+            self.last_failure = "build_attributes"
+            return None
+
+        with metrics.timer("upload_attachment") as outcome:
+            attachment_id, from_cache = self.get_attachment_id(image_path)
+            outcome["ok"] = bool(attachment_id)
+        if not attachment_id:
+            logging.error(f"Не удалось загрузить картинку '{image_path}'.")
+            self.last_failure = "upload_attachment"
+            return None
+
+        with metrics.timer("create_item") as outcome:
+            item = self.create_item(category, card['name'], virt_description, card['rawPrice'], attributes,
+                                    product_data, attachment_id)
+            outcome["ok"] = bool(item)
+        if not item and from_cache:
+            # Сохраненный id мог устареть на сервере раньше срока кэша — загружаем картинку заново.
+            # Только что загруженный id повторно не загружается: ошибка не в картинке, а повтор
+            # createItem после принятого сервером запроса создал бы второй черновик.
+            self.attachment_cache.invalidate(image_path)
+            with metrics.timer("upload_attachment") as outcome:
+                attachment_id, _ = self.get_attachment_id(image_path)
+                outcome["ok"] = bool(attachment_id)
+            if attachment_id:
+                with metrics.timer("create_item") as outcome:
+                    item = self.create_item(category, card['name'], virt_description, card['rawPrice'], attributes,
+                                            product_data, attachment_id)
+                    outcome["ok"] = bool(item)
+        if not item:
+            logging.error(f"Не удалось создать карточку '{card['name']}'.")
+            self.last_failure = "create_item" if attachment_id else "upload_attachment"
+            return None
+
+        with metrics.timer("publish_item") as outcome:
+            published = self.publish_item_free(item['id'], card['rawPrice'])
+            outcome["ok"] = bool(published)
+        if not published:
+            logging.error(f"Карточка '{card['name']}' создана, но не выставлена (черновик {item['slug']}).")
+            self.last_failure = "publish_item"
+            return None
+
+        with metrics.timer("update_item_price") as outcome:
+            price_updated = self.update_item_price(item['id'], card['price'])
+            outcome["ok"] = bool(price_updated)
+        if not price_updated:
+            logging.error(f"Не удалось установить цену со скидкой для карточки {item['slug']}.")
+            self.last_failure = "update_item_price"
+
+        logging.info(f"Карточка '{card['name']}' успешно создана: {item['slug']}")
+        return item
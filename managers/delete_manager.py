@@ -1,22 +1,10 @@
-import multiprocessing
-import random
-import time
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-import sys
 import logging
 
-from auth.auth_manager import AuthManager
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("../logs/automation.log", encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+from managers.browser_pool import BrowserPool
+from managers.log_setup import log_context
 
 
 class DeleteManager:
@@ -59,32 +47,21 @@ class DeleteManager:
             logging.error(f"Не удалось нажать кнопку 'Удалить': {e}")
 
 
-def run_bot(link, delay=0):
-    """Функция для запуска бота с возможной задержкой и обработкой ошибок"""
-    if delay > 0:
-        logging.info(f"Задержка перед запуском удаления карточки на {delay:.2f} секунд.")
-        time.sleep(delay)  # Задержка перед началом
-
-    auth_manager = AuthManager()
-    bot = DeleteManager(auth_manager, link)
-    try:
-        auth_manager.login()
-        bot.start_delete()
-    except Exception as e:
-        logging.error(f"Общая ошибка при обработке карточки: {e}")
-    finally:
-        auth_manager.close()
+def run_bot(auth_manager, link, throttle=None):
+    """Удаление одной карточки в уже авторизованном браузере процесса пула"""
+    with log_context(card=link):
+        DeleteManager(auth_manager, link).start_delete()
+    return link
 
 
-def main(links):
-    max_processes = 5
-
-    with multiprocessing.Pool(processes=max_processes) as pool:
+def main(links, max_processes=5):
+    # Процессы пула берут ссылки из общей очереди, начала задач разносит общий Pacer пула
+    with BrowserPool(run_bot, processes=max_processes) as pool:
         for link in links:
-            delay = random.uniform(1, 15)
-            pool.apply_async(run_bot, args=(link, delay))
-
-        pool.close()
-        pool.join()
+            pool.submit(link)
+        results = pool.join()
 
+    for success, result in results.values():
+        if not success:
+            logging.error(f"Общая ошибка при обработке карточки: {result}")
     logging.info("Все процессы завершены.")
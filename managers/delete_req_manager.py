@@ -1,38 +1,21 @@
+import asyncio
 import json
-import sys
 import logging
-import time
-from concurrent.futures import as_completed
-from concurrent.futures.thread import ThreadPoolExecutor
-from random import uniform
-
-import cloudscraper
-
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.FileHandler("logs/automation.log", encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
-
-
-class DeleteReqManager:
-    def __init__(self, cookies_file='data/cookies_data.ckjson'):
-        self.cookies_file = cookies_file
-        self.cookies = self.load_cookies_from_file()
-        self.scraper = cloudscraper.create_scraper()
-        self.graphql_url = "https://playerok.com/graphql"
-        self.user_id = self.get_my_id()
-        self.slugs = self.get_all_slugs()
 
-    def load_cookies_from_file(self):
-        """Загрузка куки из JSON-файла и приведение к нужному формату"""
-        with open(self.cookies_file, 'r') as f:
-            cookies = json.load(f)
-        # Приведение куки к строковому формату для заголовка
-        return '; '.join([f"{cookie['name']}={cookie['value']}" for cookie in cookies])
+from managers.config import BASE_URL
+from managers.log_setup import setup_logging
+from managers.queries import build_batch_remove_request
+from managers.req_manager import ReqManager
+
+
+class ItemsListingError(Exception):
+    """Страница списка карточек не загрузилась: список неполный, и по нему нельзя решать, каких карточек нет."""
+
+
+class DeleteReqManager(ReqManager):
+    def __init__(self, cookies_file='data/cookies_data.ckjson', client=None):
+        super().__init__(cookies_file, client=client)
+        self.user_id = self.get_my_id()
 
     def extract_id(self, response_text):
         # Преобразуем текст ответа в словарь
@@ -43,12 +26,6 @@ class DeleteReqManager:
 
         return user_id
 
-    def extract_slugs(self, response_text):
-        """Извлечение всех slugs из ответа"""
-        response_data = json.loads(response_text)
-        slugs = [edge['node']['slug'] for edge in response_data['data']['items']['edges']]
-        return slugs
-
     def extract_priority_and_game_name(self, response_text):
         """Извлечение priority и названия игры из ответа"""
         response_data = json.loads(response_text)
@@ -57,29 +34,81 @@ class DeleteReqManager:
         game_name = response_data['data']['item']['game']['name']
         return card_id, priority, game_name
 
-    def fetch_existing_cards(self):
-        """Получение всех существующих карточек с их приоритетом и названием игры"""
+    def fetch_existing_cards(self, page_size=16):
+        """Синхронная обертка над fetch_existing_cards_async."""
+        return self.client.run(self.fetch_existing_cards_async(page_size))
+
+    async def fetch_existing_cards_async(self, page_size=16):
+        """Получение всех существующих бесплатных карточек с названием игры.
+
+        Приоритет берется из списка карточек, а игра — из списков, отфильтрованных по играм из
+        data/game_names.json. Списки игр загружаются одновременно с обходом всех карточек, из которого
+        сохраняются только бесплатные. Отдельный запрос item делается только для карточек других игр.
+        Если страница списка не загрузилась, выбрасывается ItemsListingError.
+        """
+        game_names = list(self.load_section_names().values())
+        games_future = asyncio.gather(
+            *[self.get_game_card_ids_async(game_name, page_size) for game_name in game_names])
+
+        custom_items = {}
+        try:
+            async for node in self.iter_items(page_size):
+                if node['priority'] == "CUSTOM":
+                    custom_items[node['id']] = node
+            game_card_ids = await games_future
+        except BaseException:
+            games_future.cancel()
+            # Дожидаемся отмены, чтобы исключение списков игр не осталось необработанным
+            await asyncio.gather(games_future, return_exceptions=True)
+            raise
+
         exist_cards = {}
-        for slug in self.slugs:
-            game_name, card_id = self.get_card_inf(slug)
-            if game_name:
+        if not custom_items:
+            return exist_cards
+        for game_name, card_ids in zip(game_names, game_card_ids):
+            for card_id in card_ids:
+                if card_id in custom_items:
+                    exist_cards[card_id] = game_name
+
+        unknown_slugs = [node['slug'] for card_id, node in custom_items.items() if card_id not in exist_cards]
+        for card_inf in await asyncio.gather(*[self.get_card_inf_async(slug) for slug in unknown_slugs]):
+            if card_inf:
+                game_name, card_id = card_inf
                 exist_cards[card_id] = game_name
         return exist_cards
 
+    async def get_game_card_ids_async(self, game_name, page_size=16):
+        """Получение id всех карточек пользователя в указанной игре"""
+        return [node['id'] for node in await self.get_game_items_async(game_name, page_size)]
+
+    async def get_game_items_async(self, game_name, page_size=16):
+        """Получение всех карточек пользователя в указанной игре (узлы items)"""
+        game = await self.find_game_async(game_name)
+        if not game:
+            return []
+        return await ItemsPaginator(self, page_size, {"gameId": game['id']}).collect_async()
+
+    async def get_item_attributes_async(self, card_id):
+        """Атрибуты карточки (сервер, количество виртов). None, если получить не удалось."""
+        data = self.build_request("item", {"id": card_id})
+        response_data = await self.send_graphql_async(data)
+        if not response_data:
+            return None
+        return response_data['item']['attributes'] or {}
+
     def get_my_id(self, retries=10):
+        """Синхронная обертка над get_my_id_async."""
+        return self.client.run(self.get_my_id_async(retries))
+
+    async def get_my_id_async(self, retries=10):
         """Получение ID пользователя"""
         headers = self.get_common_headers()
 
-        data = {
-            "operationName": "viewer",
-            "variables": {},
-            "query": "query viewer {\n  viewer {\n    ...Viewer\n    __typename\n  }\n}\n\nfragment Viewer on User {\n  id\n  username\n  email\n  role\n  hasFrozenBalance\n  supportChatId\n  systemChatId\n  unreadChatsCounter\n  isBlocked\n  isBlockedFor\n  createdAt\n  profile {\n    id\n    avatarURL\n    __typename\n  }\n  __typename\n}"}
+        data = self.build_request("viewer")
 
         for attempt in range(retries):
             try:
-                # Пауза для снижения нагрузки на сервер, увеличивающаяся с каждой попыткой
-                time.sleep(uniform(0.5, 5) * (attempt + 1))
-                response = self.scraper.post(self.graphql_url, headers=headers, json=data)
+                response = await self.post_async(data, headers)
 
                 # Проверяем статус ответа
                 if response.status_code == 200:
@@ -95,50 +124,28 @@ class DeleteReqManager:
                 logging.error(f"Ошибка при попытке {attempt + 1}: {str(e)}")
         return None
 
-    def get_all_slugs(self):
-        """Получение slug всех карточек"""
-        headers = self.get_common_headers()
+    def iter_items(self, page_size=16):
+        """Постраничный обход всех карточек пользователя (узлы items, for и async for)"""
+        return ItemsPaginator(self, page_size)
 
-        data = {
-            "operationName": "items",
-            "variables": {
-                "pagination": {"first": 16},
-                "filter": {
-                    "userId": self.user_id,
-                    "status": ["APPROVED", "PENDING_MODERATION", "PENDING_APPROVAL"]}
-            },
-            "query": "query items($filter: ItemFilter, $pagination: Pagination) {\n  items(filter: $filter, pagination: $pagination) {\n    ...ItemProfileList\n    __typename\n  }\n}\n\nfragment ItemProfileList on ItemProfileList {\n  edges {\n    ...ItemEdgeFields\n    __typename\n  }\n  pageInfo {\n    startCursor\n    endCursor\n    hasPreviousPage\n    hasNextPage\n    __typename\n  }\n  totalCount\n  __typename\n}\n\nfragment ItemEdgeFields on ItemProfileEdge {\n  cursor\n  node {\n    ...ItemEdgeNode\n    __typename\n  }\n  __typename\n}\n\nfragment ItemEdgeNode on ItemProfile {\n  ...MyItemEdgeNode\n  ...ForeignItemEdgeNode\n  __typename\n}\n\nfragment MyItemEdgeNode on MyItemProfile {\n  id\n  slug\n  priority\n  status\n  name\n  price\n  rawPrice\n  statusExpirationDate\n  sellerType\n  attachment {\n    ...PartialFile\n    __typename\n  }\n  user {\n    ...UserItemEdgeNode\n    __typename\n  }\n  approvalDate\n  createdAt\n  priorityPosition\n  __typename\n}\n\nfragment PartialFile on File {\n  id\n  url\n  __typename\n}\n\nfragment UserItemEdgeNode on UserFragment {\n  ...UserEdgeNode\n  __typename\n}\n\nfragment UserEdgeNode on UserFragment {\n  ...RegularUserFragment\n  __typename\n}\n\nfragment RegularUserFragment on UserFragment {\n  id\n  username\n  role\n  avatarURL\n  isOnline\n  isBlocked\n  rating\n  testimonialCounter\n  createdAt\n  supportChatId\n  systemChatId\n  __typename\n}\n\nfragment ForeignItemEdgeNode on ForeignItemProfile {\n  id\n  slug\n  priority\n  status\n  name\n  price\n  rawPrice\n  sellerType\n  attachment {\n    ...PartialFile\n    __typename\n  }\n  user {\n    ...UserItemEdgeNode\n    __typename\n  }\n  approvalDate\n  priorityPosition\n  createdAt\n  __typename\n}"}
-
-        # Отправка POST-запроса на удаление товара
-        response = self.scraper.post(self.graphql_url, headers=headers, json=data)
-
-        # Проверяем статус ответа
-        if response.status_code == 200:
-            self.slugs = self.extract_slugs(response.text)
-        else:
-            logging.error(f"Ошибка получения всех slugs: {response.status_code}, {response.text}")
-
-        return self.slugs
+    def get_all_slugs(self, page_size=16):
+        """Получение slug всех карточек"""
+        return [node['slug'] for node in self.iter_items(page_size)]
 
     def get_card_inf(self, slug, retries=5):
-        referer_url = "https://playerok.com/products/" + slug
+        """Синхронная обертка над get_card_inf_async."""
+        return self.client.run(self.get_card_inf_async(slug, retries))
+
+    async def get_card_inf_async(self, slug, retries=5):
+        referer_url = f"{BASE_URL}/products/{slug}"
         headers = self.get_common_headers()
         headers['Referer'] = referer_url
-        data = {
-            "operationName": "item",
-            "variables": {
-                "slug": slug
-            },
-            "query": "query item($slug: String, $id: UUID) {\n  item(slug: $slug, id: $id) {\n    ...RegularItem\n    __typename\n  }\n}\n\nfragment RegularItem on Item {\n  ...RegularMyItem\n  ...RegularForeignItem\n  __typename\n}\n\nfragment RegularMyItem on MyItem {\n  ...ItemFields\n  priority\n  sequence\n  priorityPrice\n  statusExpirationDate\n  comment\n  viewsCounter\n  statusDescription\n  editable\n  statusPayment {\n    ...StatusPaymentTransaction\n    __typename\n  }\n  moderator {\n    id\n    username\n    __typename\n  }\n  approvalDate\n  deletedAt\n  createdAt\n  updatedAt\n  mayBePublished\n  __typename\n}\n\nfragment ItemFields on Item {\n  id\n  slug\n  name\n  description\n  rawPrice\n  price\n  attributes\n  status\n  priorityPosition\n  sellerType\n  user {\n    ...ItemUser\n    __typename\n  }\n  buyer {\n    ...ItemUser\n    __typename\n  }\n  attachments {\n    ...PartialFile\n    __typename\n  }\n  category {\n    ...RegularGameCategory\n    __typename\n  }\n  game {\n    ...RegularGameProfile\n    __typename\n  }\n  comment\n  dataFields {\n    ...GameCategoryDataFieldWithValue\n    __typename\n  }\n  obtainingType {\n    ...GameCategoryObtainingType\n    __typename\n  }\n  __typename\n}\n\nfragment ItemUser on UserFragment {\n  ...UserEdgeNode\n  __typename\n}\n\nfragment UserEdgeNode on UserFragment {\n  ...RegularUserFragment\n  __typename\n}\n\nfragment RegularUserFragment on UserFragment {\n  id\n  username\n  role\n  avatarURL\n  isOnline\n  isBlocked\n  rating\n  testimonialCounter\n  createdAt\n  supportChatId\n  systemChatId\n  __typename\n}\n\nfragment PartialFile on File {\n  id\n  url\n  __typename\n}\n\nfragment RegularGameCategory on GameCategory {\n  id\n  slug\n  name\n  categoryId\n  gameId\n  obtaining\n  options {\n    ...RegularGameCategoryOption\n    __typename\n  }\n  props {\n    ...GameCategoryProps\n    __typename\n  }\n  noCommentFromBuyer\n  instructionForBuyer\n  instructionForSeller\n  useCustomObtaining\n  autoConfirmPeriod\n  autoModerationMode\n  __typename\n}\n\nfragment RegularGameCategoryOption on GameCategoryOption {\n  id\n  group\n  label\n  type\n  field\n  value\n  sequence\n  valueRangeLimit {\n    min\n    max\n    __typename\n  }\n  __typename\n}\n\nfragment GameCategoryProps on GameCategoryPropsObjectType {\n  minTestimonials\n  __typename\n}\n\nfragment RegularGameProfile on GameProfile {\n  id\n  name\n  type\n  slug\n  logo {\n    ...PartialFile\n    __typename\n  }\n  __typename\n}\n\nfragment GameCategoryDataFieldWithValue on GameCategoryDataFieldWithValue {\n  id\n  label\n  type\n  inputType\n  copyable\n  hidden\n  required\n  value\n  __typename\n}\n\nfragment GameCategoryObtainingType on GameCategoryObtainingType {\n  id\n  name\n  description\n  gameCategoryId\n  noCommentFromBuyer\n  instructionForBuyer\n  instructionForSeller\n  sequence\n  __typename\n}\n\nfragment StatusPaymentTransaction on Transaction {\n  id\n  operation\n  direction\n  providerId\n  status\n  statusDescription\n  statusExpirationDate\n  value\n  props {\n    paymentURL\n    __typename\n  }\n  __typename\n}\n\nfragment RegularForeignItem on ForeignItem {\n  ...ItemFields\n  __typename\n}"
-        }
+        data = self.build_request("item", {"slug": slug})
 
         for attempt in range(retries):
             try:
-                # Пауза для снижения нагрузки на сервер, увеличивающаяся с каждой попыткой
-                time.sleep(uniform(0.5, 5) * (attempt + 1))
-
                 # Отправка POST-запроса
-                response = self.scraper.post(self.graphql_url, headers=headers, json=data)
+                response = await self.post_async(data, headers)
 
                 # Проверка успешного ответа
                 if response.status_code == 200:
@@ -161,18 +168,19 @@ class DeleteReqManager:
         return None
 
     def delete_card(self, card_id, retries=10):
+        """Синхронная обертка над delete_card_async."""
+        return self.client.run(self.delete_card_async(card_id, retries))
+
+    async def delete_card_async(self, card_id, retries=10):
         headers = self.get_common_headers()
-        data = {
-            "operationName": "removeItem",
-            "variables": {"id": card_id},
-            "query": "mutation removeItem($id: UUID!) {\n  removeItem(id: $id) {\n    ...RegularItem\n    __typename\n  }\n}\n\nfragment RegularItem on Item {\n  ...RegularMyItem\n  ...RegularForeignItem\n  __typename\n}\n\nfragment RegularMyItem on MyItem {\n  ...ItemFields\n  priority\n  sequence\n  priorityPrice\n  statusExpirationDate\n  comment\n  viewsCounter\n  statusDescription\n  editable\n  statusPayment {\n    ...StatusPaymentTransaction\n    __typename\n  }\n  moderator {\n    id\n    username\n    __typename\n  }\n  approvalDate\n  deletedAt\n  createdAt\n  updatedAt\n  mayBePublished\n  __typename\n}\n\nfragment ItemFields on Item {\n  id\n  slug\n  name\n  description\n  rawPrice\n  price\n  attributes\n  status\n  priorityPosition\n  sellerType\n  user {\n    ...ItemUser\n    __typename\n  }\n  buyer {\n    ...ItemUser\n    __typename\n  }\n  attachments {\n    ...PartialFile\n    __typename\n  }\n  category {\n    ...RegularGameCategory\n    __typename\n  }\n  game {\n    ...RegularGameProfile\n    __typename\n  }\n  comment\n  dataFields {\n    ...GameCategoryDataFieldWithValue\n    __typename\n  }\n  obtainingType {\n    ...GameCategoryObtainingType\n    __typename\n  }\n  __typename\n}\n\nfragment ItemUser on UserFragment {\n  ...UserEdgeNode\n  __typename\n}\n\nfragment UserEdgeNode on UserFragment {\n  ...RegularUserFragment\n  __typename\n}\n\nfragment RegularUserFragment on UserFragment {\n  id\n  username\n  role\n  avatarURL\n  isOnline\n  isBlocked\n  rating\n  testimonialCounter\n  createdAt\n  supportChatId\n  systemChatId\n  __typename\n}\n\nfragment PartialFile on File {\n  id\n  url\n  __typename\n}\n\nfragment RegularGameCategory on GameCategory {\n  id\n  slug\n  name\n  categoryId\n  gameId\n  obtaining\n  options {\n    ...RegularGameCategoryOption\n    __typename\n  }\n  props {\n    ...GameCategoryProps\n    __typename\n  }\n  noCommentFromBuyer\n  instructionForBuyer\n  instructionForSeller\n  useCustomObtaining\n  autoConfirmPeriod\n  autoModerationMode\n  __typename\n}\n\nfragment RegularGameCategoryOption on GameCategoryOption {\n  id\n  group\n  label\n  type\n  field\n  value\n  sequence\n  valueRangeLimit {\n    min\n    max\n    __typename\n  }\n  __typename\n}\n\nfragment GameCategoryProps on GameCategoryPropsObjectType {\n  minTestimonials\n  __typename\n}\n\nfragment RegularGameProfile on GameProfile {\n  id\n  name\n  type\n  slug\n  logo {\n    ...PartialFile\n    __typename\n  }\n  __typename\n}\n\nfragment GameCategoryDataFieldWithValue on GameCategoryDataFieldWithValue {\n  id\n  label\n  type\n  inputType\n  copyable\n  hidden\n  required\n  value\n  __typename\n}\n\nfragment GameCategoryObtainingType on GameCategoryObtainingType {\n  id\n  name\n  description\n  gameCategoryId\n  noCommentFromBuyer\n  instructionForBuyer\n  instructionForSeller\n  sequence\n  __typename\n}\n\nfragment StatusPaymentTransaction on Transaction {\n  id\n  operation\n  direction\n  providerId\n  status\n  statusDescription\n  statusExpirationDate\n  value\n  props {\n    paymentURL\n    __typename\n  }\n  __typename\n}\n\nfragment RegularForeignItem on ForeignItem {\n  ...ItemFields\n  __typename\n}"
-        }
+        data = self.build_request("removeItem", {"id": card_id})
 
         for attempt in range(retries):
-            # Пауза для снижения нагрузки на сервер
-            time.sleep(uniform(0.5, 8) * (attempt + 1))  # Увеличение задержки при повторных попытках
-
-            response = self.scraper.post(self.graphql_url, headers=headers, json=data)
+            try:
+                response = await self.post_async(data, headers)
+            except Exception as e:
+                logging.error(f"Ошибка при попытке {attempt + 1}: {str(e)}")
+                continue
             if response.status_code == 200:
                 return f"Товар {card_id} успешно удален!"
             elif response.status_code == 429:
@@ -185,31 +193,167 @@ class DeleteReqManager:
         return f"Не удалось удалить товар {card_id} после {retries} попыток"
 
     def delete_cards_parallel(self, card_ids, max_workers=5):
-        results = []
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            future_to_card = {executor.submit(self.delete_card, card_id, 10): card_id for card_id in card_ids}
+        """Синхронная обертка над delete_cards_parallel_async."""
+        return self.client.run(self.delete_cards_parallel_async(card_ids, max_workers))
+
+    async def delete_cards_parallel_async(self, card_ids, max_workers=5):
+        """Параллельное удаление карточек, не более max_workers запросов одновременно"""
+        semaphore = asyncio.Semaphore(max_workers)
 
-            for future in as_completed(future_to_card):
-                card_id = future_to_card[future]
+        async def delete(card_id):
+            async with semaphore:
                 try:
-                    result = future.result()
-                    results.append(result)
+                    return await self.delete_card_async(card_id, 10)
                 except Exception as exc:
-                    results.append(f"Карточка {card_id} вызвала исключение: {exc}")
+                    return f"Карточка {card_id} вызвала исключение: {exc}"
 
+        return await asyncio.gather(*[delete(card_id) for card_id in card_ids])
+
+    def delete_cards_batched(self, card_ids, batch_size=25, max_workers=5, retries=10):
+        """Синхронная обертка над delete_cards_batched_async."""
+        return self.client.run(self.delete_cards_batched_async(card_ids, batch_size, max_workers, retries))
+
+    async def delete_cards_batched_async(self, card_ids, batch_size=25, max_workers=5, retries=10):
+        """Удаление карточек пачками: несколько removeItem в одном GraphQL-документе через алиасы.
+
+        Возвращает словарь {id карточки: (успех, сообщение)}.
+        """
+        semaphore = asyncio.Semaphore(max_workers)
+        batches = [card_ids[i:i + batch_size] for i in range(0, len(card_ids), batch_size)]
+
+        async def delete(batch):
+            async with semaphore:
+                try:
+                    return await self.delete_batch_async(batch, retries)
+                except Exception as exc:
+                    return {card_id: (False, f"Карточка {card_id} вызвала исключение: {exc}") for card_id in batch}
+
+        results = {}
+        for batch_results in await asyncio.gather(*[delete(batch) for batch in batches]):
+            results.update(batch_results)
+        return results
+
+    async def delete_batch_async(self, card_ids, retries=10):
+        """Удаление одной пачки карточек одним запросом"""
+        data, aliases = build_batch_remove_request(card_ids, self.persisted_queries)
+        headers = self.get_common_headers()
+
+        for attempt in range(retries):
+            try:
+                response = await self.post_async(data, headers)
+            except Exception as e:
+                logging.error(f"Ошибка при попытке {attempt + 1}: {str(e)}")
+                continue
+
+            if response.status_code == 200:
+                return self.extract_batch_results(json.loads(response.text), aliases)
+            elif response.status_code == 429:
+                logging.error(f"Слишком много запросов. Попытка {attempt + 1} из {retries}. Ждем...")
+            elif response.status_code == 403:
+                logging.error(f"Запрос заблокирован. Попытка {attempt + 1} из {retries}. Ждем...")
+            else:
+                return {card_id: (False, f"Ошибка при удалении товара {card_id}: {response.status_code}, {response.text}")
+                        for card_id in card_ids}
+
+        return {card_id: (False, f"Не удалось удалить товар {card_id} после {retries} попыток") for card_id in card_ids}
+
+    def extract_batch_results(self, response_data, aliases):
+        """Сопоставление результатов и ошибок по алиасам с id карточек"""
+        errors = {}
+        for error in response_data.get('errors') or []:
+            path = error.get('path') or []
+            if path and path[0] in aliases:
+                errors[path[0]] = error.get('message')
+
+        data = response_data.get('data') or {}
+        results = {}
+        for alias, card_id in aliases.items():
+            if alias in errors:
+                results[card_id] = (False, f"Ошибка при удалении товара {card_id}: {errors[alias]}")
+            elif data.get(alias):
+                results[card_id] = (True, f"Товар {card_id} успешно удален!")
+            else:
+                results[card_id] = (False, f"Ошибка при удалении товара {card_id}: {response_data.get('errors')}")
         return results
 
-    def get_common_headers(self):
-        return {
-            "Accept-Language": "en-US,en;q=0.9,ru;q=0.8",
-            "Apollo-Require-Preflight": "true",
-            "Apollographql-Client-Name": "web",
-            "Content-Type": "application/json",
-            "Cookie": self.cookies,
-        }
+
+class ItemsPaginator:
+    """Обход списка карточек пользователя по курсору pageInfo.endCursor.
+
+    Узлы отдаются по мере загрузки страниц, поэтому обработку можно начинать до окончания обхода.
+    Общее количество карточек (totalCount) доступно сразу после загрузки первой страницы.
+    Если страница не загрузилась и после повторов, выбрасывается ItemsListingError, а не обход
+    заканчивается на неполном списке.
+    """
+
+    STATUSES = ["APPROVED", "PENDING_MODERATION", "PENDING_APPROVAL"]
+
+    def __init__(self, manager, page_size=16, item_filter=None):
+        self.manager = manager
+        self.page_size = page_size
+        self.filter = item_filter or {}
+        self.first_page = None
+
+    @property
+    def total_count(self):
+        """Общее количество карточек пользователя"""
+        if self.first_page is None:
+            self.first_page = self.fetch_page()
+        return self.first_page['totalCount']
+
+    def fetch_page(self, after=None):
+        """Синхронная обертка над fetch_page_async"""
+        return self.manager.client.run(self.fetch_page_async(after))
+
+    async def fetch_page_async(self, after=None):
+        """Загрузка одной страницы списка карточек"""
+        pagination = {"first": self.page_size}
+        if after:
+            pagination["after"] = after
+
+        data = self.manager.build_request("items", {
+            "pagination": pagination,
+            "filter": {
+                "userId": self.manager.user_id,
+                "status": self.STATUSES,
+                **self.filter}
+        })
+        response_data = await self.manager.send_graphql_async(data)
+        if not response_data:
+            raise ItemsListingError(f"Ошибка получения страницы карточек (курсор: {after})")
+        return response_data['items']
+
+    def __iter__(self):
+        if self.first_page is None:
+            self.first_page = self.fetch_page()
+
+        page = self.first_page
+        while True:
+            for edge in page['edges']:
+                yield edge['node']
+
+            if not page['pageInfo']['hasNextPage']:
+                break
+            page = self.fetch_page(page['pageInfo']['endCursor'])
+
+    async def __aiter__(self):
+        """Обход внутри цикла событий: следующая страница загружается без блокировки других задач"""
+        page = self.first_page or await self.fetch_page_async()
+        while True:
+            for edge in page['edges']:
+                yield edge['node']
+
+            if not page['pageInfo']['hasNextPage']:
+                break
+            page = await self.fetch_page_async(page['pageInfo']['endCursor'])
+
+    async def collect_async(self):
+        """Загрузка всех страниц без блокировки цикла событий"""
+        return [node async for node in self]
 
 
 if __name__ == '__main__':
+    setup_logging()
     mhg = DeleteReqManager()
     # x = mhg.get_all_slugs()
     print(mhg.delete_card("1ef8ee2d-75e7-66a0-84da-19234486a8a2"))
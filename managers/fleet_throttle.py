@@ -0,0 +1,81 @@
+import logging
+import multiprocessing
+import time
+from contextlib import contextmanager
+
+from managers.metrics import metrics
+
+
+class FleetThrottle:
+    """Общая для всех процессов пула пауза после 'Попробуйте позже' с плавным восстановлением параллельности.
+
+    Процесс, получивший ограничение, ставит на паузу все процессы пула и вдвое уменьшает количество
+    одновременно выставляемых карточек. После каждых ramp_up_after успешных карточек оно увеличивается
+    на одну, пока не вернется к max_active. Состояние хранится в общей памяти (multiprocessing.Value),
+    поэтому объект нужно передать в процессы при их создании.
+    """
+
+    def __init__(self, max_active, ramp_up_after=3, decrease=0.5):
+        self.max_active = max_active
+        self.ramp_up_after = ramp_up_after
+        self.decrease = decrease
+        self.condition = multiprocessing.Condition()
+        # Значения защищены блокировкой condition, поэтому собственные блокировки им не нужны
+        self.paused_until = multiprocessing.Value('d', 0.0, lock=False)
+        self.allowed = multiprocessing.Value('i', max_active, lock=False)
+        self.active = multiprocessing.Value('i', 0, lock=False)
+        self.successes = multiprocessing.Value('i', 0, lock=False)
+
+    def wait(self):
+        """Ожидание окончания общей паузы."""
+        with self.condition:
+            self.wait_pause()
+
+    def wait_pause(self):
+        # Вызывается под блокировкой condition; time.time(), а не monotonic, — значение общее для процессов
+        while True:
+            remaining = self.paused_until.value - time.time()
+            if remaining <= 0:
+                return
+            self.condition.wait(remaining)
+
+    @contextmanager
+    def slot(self):
+        """Место для выставления одной карточки: ждет окончания паузы и свободного места."""
+        with self.condition:
+            while True:
+                self.wait_pause()
+                if self.active.value < self.allowed.value:
+                    break
+                self.condition.wait(1)
+            self.active.value += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active.value -= 1
+                self.condition.notify_all()
+
+    def on_throttle(self, pause):
+        """Пауза всех процессов на pause секунд. Параллельность снижается один раз за паузу,
+        даже если ограничение одновременно заметили несколько процессов."""
+        with self.condition:
+            now = time.time()
+            if self.paused_until.value <= now:
+                self.allowed.value = max(1, int(self.allowed.value * self.decrease))
+            self.paused_until.value = max(self.paused_until.value, now + pause)
+            self.successes.value = 0
+            allowed = self.allowed.value
+        metrics.count_throttle()
+        logging.warning(f"Сайт ограничил запросы: пауза всех процессов на {pause:.0f} с, "
+                        f"одновременно выставляется карточек: {allowed}.")
+
+    def on_success(self):
+        """Учет успешной карточки и постепенное увеличение параллельности."""
+        with self.condition:
+            self.successes.value += 1
+            if self.successes.value >= self.ramp_up_after and self.allowed.value < self.max_active:
+                self.allowed.value += 1
+                self.successes.value = 0
+                logging.info(f"Одновременно выставляется карточек: {self.allowed.value}.")
+                self.condition.notify_all()
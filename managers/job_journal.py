@@ -0,0 +1,119 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+
+class JobJournal:
+    """Журнал запусков создания и удаления карточек в SQLite.
+
+    Каждый запуск (run) хранит свои задания со статусами pending / in_progress / done / failed.
+    Если запуск прервался или часть заданий не выполнилась, его можно продолжить: повторно
+    выполняются только задания, которые не завершились успешно. Задания, оставшиеся in_progress,
+    прервались на середине, и перед повтором их нужно сверить с сайтом.
+    """
+
+    PENDING = "pending"
+    IN_PROGRESS = "in_progress"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, path='data/journal.sqlite3'):
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=30)
+        self.connection.row_factory = sqlite3.Row
+        with self.connection:
+            self.connection.executescript("""
+                CREATE TABLE IF NOT EXISTS runs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    scope TEXT NOT NULL,
+                    started_at REAL NOT NULL,
+                    finished_at REAL
+                );
+                CREATE TABLE IF NOT EXISTS jobs (
+                    run_id INTEGER NOT NULL REFERENCES runs(id),
+                    key TEXT NOT NULL,
+                    game TEXT,
+                    server TEXT,
+                    payload TEXT,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (run_id, key)
+                );
+            """)
+
+    @staticmethod
+    def card_key(game, server, card):
+        """Ключ задания создания карточки: (игра, сервер, пресет)."""
+        raw = json.dumps([game, server or "", card], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def find_unfinished_run(self, kind, scope):
+        """id последнего незавершенного запуска для kind ('create'/'delete') и scope (игра) или None."""
+        row = self.connection.execute(
+            "SELECT id FROM runs WHERE kind = ? AND scope = ? AND finished_at IS NULL ORDER BY id DESC LIMIT 1",
+            (kind, scope)).fetchone()
+        return row["id"] if row else None
+
+    def start_run(self, kind, scope):
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO runs (kind, scope, started_at) VALUES (?, ?, ?)", (kind, scope, time.time()))
+        return cursor.lastrowid
+
+    def add(self, run_id, key, game=None, server=None, payload=None):
+        """Добавление задания в запуск. Уже существующее задание не меняется."""
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR IGNORE INTO jobs (run_id, key, game, server, payload, status, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, key, game, server, json.dumps(payload, ensure_ascii=False), self.PENDING, time.time()))
+
+    def set_status(self, run_id, key, status, result=None, error=None):
+        attempts = 1 if status == self.IN_PROGRESS else 0
+        with self.connection:
+            self.connection.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = ?, "
+                "attempts = attempts + ?, updated_at = ? WHERE run_id = ? AND key = ?",
+                (status, result, error, attempts, time.time(), run_id, key))
+
+    def start(self, run_id, key):
+        self.set_status(run_id, key, self.IN_PROGRESS)
+
+    def done(self, run_id, key, result=None):
+        self.set_status(run_id, key, self.DONE, result=result)
+
+    def fail(self, run_id, key, error):
+        self.set_status(run_id, key, self.FAILED, error=str(error))
+
+    def status(self, run_id, key):
+        """Статус задания или None, если его нет в запуске."""
+        row = self.connection.execute(
+            "SELECT status FROM jobs WHERE run_id = ? AND key = ?", (run_id, key)).fetchone()
+        return row["status"] if row else None
+
+    def remaining(self, run_id):
+        """Задания запуска, которые еще нужно выполнить."""
+        return self.connection.execute(
+            "SELECT * FROM jobs WHERE run_id = ? AND status != ? ORDER BY rowid", (run_id, self.DONE)).fetchall()
+
+    def summary(self, run_id):
+        """Количество заданий запуска по статусам."""
+        rows = self.connection.execute(
+            "SELECT status, COUNT(*) AS count FROM jobs WHERE run_id = ? GROUP BY status", (run_id,)).fetchall()
+        return {row["status"]: row["count"] for row in rows}
+
+    def finish_run_if_complete(self, run_id):
+        """Отметка запуска завершенным, если все его задания выполнены. Возвращает True, если завершен."""
+        if self.remaining(run_id):
+            return False
+        with self.connection:
+            self.connection.execute("UPDATE runs SET finished_at = ? WHERE id = ?", (time.time(), run_id))
+        return True
+
+    def close(self):
+        self.connection.close()
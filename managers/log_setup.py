@@ -0,0 +1,133 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import signal
+import sys
+from contextlib import contextmanager
+
+CONTEXT_FIELDS = ("worker", "section", "server", "card")
+
+# Контекст текущего процесса (раздел, сервер, карточка), добавляется ко всем его записям
+context = {}
+
+log_queue = None
+listener = None
+
+
+class ContextFilter(logging.Filter):
+    """Добавляет к записи контекст процесса: worker, section, server, card."""
+
+    def filter(self, record):
+        for field in CONTEXT_FIELDS:
+            if getattr(record, field, None) is None:
+                setattr(record, field, context.get(field))
+        if record.worker is None:
+            record.worker = multiprocessing.current_process().name
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Запись лога одной строкой JSON."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in CONTEXT_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+@contextmanager
+def log_context(**fields):
+    """Контекст записей внутри блока: with log_context(section=2, server="Red", card="10kk"): ..."""
+    previous = dict(context)
+    context.update(fields)
+    try:
+        yield
+    finally:
+        context.clear()
+        context.update(previous)
+
+
+def listen(queue, log_file, max_bytes, backup_count):
+    """Процесс записи лога: единственный, кто пишет в файл и консоль."""
+    # Ctrl+C получают все процессы группы; запись лога должна дождаться сообщений остальных
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    file_handler = logging.handlers.RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count,
+                                                        encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+
+    while True:
+        record = queue.get()
+        if record is None:
+            break
+        for handler in (file_handler, console_handler):
+            try:
+                handler.handle(record)
+            except Exception:
+                handler.handleError(record)
+    file_handler.close()
+
+
+def configure_worker(queue, level=logging.INFO):
+    """Отправка записей текущего процесса в очередь процесса записи лога."""
+    handler = logging.handlers.QueueHandler(queue)
+    handler.addFilter(ContextFilter())
+    root = logging.getLogger()
+    for old_handler in root.handlers[:]:
+        root.removeHandler(old_handler)
+    root.addHandler(handler)
+    root.setLevel(level)
+
+
+def setup_logging(log_file="logs/automation.log", level=logging.INFO, max_bytes=10 * 1024 * 1024, backup_count=5):
+    """Запуск процесса записи лога и настройка логирования основного процесса. Возвращает очередь записей.
+
+    Файл пишется строками JSON и ротируется при достижении max_bytes (хранится backup_count старых файлов).
+    Процессы пула получают очередь (get_log_queue) и подключаются к ней через configure_worker.
+    """
+    global log_queue, listener
+    if listener is not None:
+        return log_queue
+
+    os.makedirs(os.path.dirname(log_file) or ".", exist_ok=True)
+    log_queue = multiprocessing.Queue(-1)
+    listener = multiprocessing.Process(target=listen, args=(log_queue, log_file, max_bytes, backup_count),
+                                       name="log_listener", daemon=True)
+    listener.start()
+    configure_worker(log_queue, level)
+    atexit.register(stop_logging)
+    return log_queue
+
+
+def get_log_queue():
+    """Очередь записей лога или None, если setup_logging не вызывался."""
+    return log_queue
+
+
+def stop_logging():
+    """Запись оставшихся сообщений и остановка процесса записи лога."""
+    global log_queue, listener
+    if listener is None:
+        return
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    log_queue.put(None)
+    listener.join(timeout=10)
+    log_queue = None
+    listener = None
@@ -0,0 +1,175 @@
+import json
+import logging
+import math
+import os
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу. None для пустого списка."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered), max(1, math.ceil(fraction * len(ordered)))) - 1
+    return round(ordered[index], 3)
+
+
+class Metrics:
+    """Метрики запуска: время шагов и карточек, повторы, ограничения сайта и причины ошибок.
+
+    У каждого процесса свой объект metrics. Процессы пула отправляют свои замеры (export) в основной
+    процесс, где они объединяются (merge) и попадают в итоговый отчет (summary).
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.started = time.time()
+        self.steps = defaultdict(list)
+        self.step_failures = Counter()
+        self.retries = Counter()
+        self.throttles = 0
+        self.cards = []
+        self.failures = Counter()
+
+    def observe_step(self, step, seconds, ok=True):
+        if ok:
+            self.steps[step].append(seconds)
+        else:
+            self.step_failures[step] += 1
+
+    @contextmanager
+    def timer(self, step):
+        """Замер времени шага: with metrics.timer("fill_pic") as outcome: ...
+
+        Шаг с исключением считается неудачным. Шаги, которые сообщают об ошибке результатом, а не
+        исключением, отмечают ее сами: outcome["ok"] = bool(result).
+        """
+        outcome = {"ok": True}
+        start = time.monotonic()
+        try:
+            yield outcome
+        except BaseException:
+            self.observe_step(step, time.monotonic() - start, ok=False)
+            raise
+        self.observe_step(step, time.monotonic() - start, ok=outcome["ok"])
+
+    def count_retry(self, step, kind):
+        self.retries[(step, kind)] += 1
+
+    def count_throttle(self):
+        self.throttles += 1
+
+    def observe_card(self, seconds, ok=True, reason=None):
+        self.cards.append((seconds, ok))
+        if not ok:
+            self.failures[reason or "unknown"] += 1
+
+    def export(self):
+        """Замеры в виде, пригодном для передачи между процессами (pickle/JSON)."""
+        return {
+            "steps": dict(self.steps),
+            "step_failures": dict(self.step_failures),
+            "retries": [[step, kind, count] for (step, kind), count in self.retries.items()],
+            "throttles": self.throttles,
+            "cards": self.cards,
+            "failures": dict(self.failures),
+        }
+
+    def merge(self, data):
+        """Добавление замеров другого процесса."""
+        for step, values in data["steps"].items():
+            self.steps[step].extend(values)
+        self.step_failures.update(data["step_failures"])
+        for step, kind, count in data["retries"]:
+            self.retries[(step, kind)] += count
+        self.throttles += data["throttles"]
+        self.cards.extend(tuple(card) for card in data["cards"])
+        self.failures.update(data["failures"])
+
+    def summary(self):
+        """Итог запуска: p50/p95 по шагам, карточки в минуту, повторы и причины ошибок."""
+        elapsed = time.time() - self.started
+        done = sum(1 for _, ok in self.cards if ok)
+        card_times = [seconds for seconds, ok in self.cards if ok]
+        return {
+            "elapsed_seconds": round(elapsed, 1),
+            "cards": {
+                "done": done,
+                "failed": len(self.cards) - done,
+                "per_minute": round(done / elapsed * 60, 2) if elapsed > 0 else 0.0,
+                "p50_seconds": percentile(card_times, 0.5),
+                "p95_seconds": percentile(card_times, 0.95),
+            },
+            "steps": {
+                step: {
+                    "count": len(self.steps.get(step, [])),
+                    "failed": self.step_failures.get(step, 0),
+                    "p50_seconds": percentile(self.steps.get(step, []), 0.5),
+                    "p95_seconds": percentile(self.steps.get(step, []), 0.95),
+                    "total_seconds": round(sum(self.steps.get(step, [])), 3),
+                }
+                for step in sorted(set(self.steps) | set(self.step_failures))
+            },
+            "retries": [{"step": step, "kind": kind, "count": count}
+                        for (step, kind), count in sorted(self.retries.items())],
+            "throttles": self.throttles,
+            "failure_reasons": dict(self.failures.most_common()),
+        }
+
+    def write_json(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(self.summary(), file, ensure_ascii=False, indent=4)
+
+    def prometheus_text(self):
+        """Итог в текстовом формате Prometheus (для node_exporter textfile collector или pushgateway)."""
+        summary = self.summary()
+        lines = ["# TYPE playerok_step_seconds summary"]
+        for step, stats in summary["steps"].items():
+            for quantile, key in (("0.5", "p50_seconds"), ("0.95", "p95_seconds")):
+                if stats[key] is not None:
+                    lines.append(f'playerok_step_seconds{{step="{step}",quantile="{quantile}"}} {stats[key]:.3f}')
+            lines.append(f'playerok_step_seconds_count{{step="{step}"}} {stats["count"]}')
+            lines.append(f'playerok_step_seconds_sum{{step="{step}"}} {stats["total_seconds"]}')
+        lines.append("# TYPE playerok_step_failures_total counter")
+        for step, stats in summary["steps"].items():
+            lines.append(f'playerok_step_failures_total{{step="{step}"}} {stats["failed"]}')
+        lines.append("# TYPE playerok_retries_total counter")
+        for retry in summary["retries"]:
+            lines.append(f'playerok_retries_total{{step="{retry["step"]}",kind="{retry["kind"]}"}} {retry["count"]}')
+        lines.append("# TYPE playerok_throttles_total counter")
+        lines.append(f"playerok_throttles_total {summary['throttles']}")
+        lines.append("# TYPE playerok_cards_total counter")
+        lines.append(f'playerok_cards_total{{status="done"}} {summary["cards"]["done"]}')
+        lines.append(f'playerok_cards_total{{status="failed"}} {summary["cards"]["failed"]}')
+        lines.append("# TYPE playerok_card_failures_total counter")
+        for reason, count in summary["failure_reasons"].items():
+            reason = reason.replace("\\", "\\\\").replace('"', '\\"')
+            lines.append(f'playerok_card_failures_total{{reason="{reason}"}} {count}')
+        lines.append("# TYPE playerok_cards_per_minute gauge")
+        lines.append(f"playerok_cards_per_minute {summary['cards']['per_minute']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(self.prometheus_text())
+
+    def log_summary(self):
+        summary = self.summary()
+        cards = summary["cards"]
+        logging.info(f"Итог запуска: карточек обработано {cards['done']}, с ошибкой {cards['failed']}, "
+                     f"{cards['per_minute']} в минуту, ограничений сайта {summary['throttles']}.")
+        for step, stats in summary["steps"].items():
+            logging.info(f"Шаг '{step}': {stats['count']} раз, p50 {stats['p50_seconds']} с, "
+                         f"p95 {stats['p95_seconds']} с, ошибок {stats['failed']}.")
+        if summary["failure_reasons"]:
+            logging.info(f"Причины ошибок: {summary['failure_reasons']}")
+
+
+# Метрики текущего процесса
+metrics = Metrics()
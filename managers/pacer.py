@@ -0,0 +1,26 @@
+import multiprocessing
+import time
+
+
+class Pacer:
+    """Общий для процессов пула интервал между началами задач.
+
+    Вместо случайной задержки в каждой задаче процессы по очереди получают ближайшее свободное время
+    старта: задачи начинаются не чаще раза в interval секунд, а пока очередь не пуста, процесс ждет
+    не дольше, чем нужно для соблюдения интервала. Объект нужно передать в процессы при их создании.
+    """
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.lock = multiprocessing.Lock()
+        # time.time(), а не monotonic: значение сравнивается в разных процессах
+        self.next_start = multiprocessing.Value('d', 0.0, lock=False)
+
+    def wait_turn(self):
+        """Ожидание своей очереди на начало задачи."""
+        with self.lock:
+            now = time.time()
+            start = max(now, self.next_start.value)
+            self.next_start.value = start + self.interval
+        if start > now:
+            time.sleep(start - now)
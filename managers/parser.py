@@ -1,6 +1,4 @@
 import logging
-import multiprocessing
-import random
 import time
 from selenium.webdriver.common.by import By
 from selenium.common.exceptions import TimeoutException
@@ -8,6 +6,8 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
 from auth.auth_manager import AuthManager
+from managers.browser_pool import BrowserPool
+from managers.config import BASE_URL
 
 
 class ProductParser:
@@ -17,13 +17,11 @@ class ProductParser:
 
     def run_parser(self):
         """Метод автоматизации."""
-        logging.basicConfig(level=logging.INFO)
-
         try:
             self.auth_manager.login()
 
             # Переход к нужной секции (замените на реальный URL секции)
-            section_url = "https://playerok.com/profile/"  # Замените на реальный URL
+            section_url = f"{BASE_URL}/profile/"  # Замените на реальный URL
             self.navigate_to_section(section_url)
 
             # Прокрутка страницы до конца для подгрузки всех продуктов (если необходимо)
@@ -86,28 +84,28 @@ class ProductParser:
 
 
 class FreeProductParser:
-    def __init__(self, link):
-        self.auth_manager = AuthManager()
+    def __init__(self, link, auth_manager=None):
+        self.auth_manager = auth_manager or AuthManager()
         self.free_product_links = list()
         self.link = link
 
     def run_checker(self):
         """Метод автоматизации."""
-        logging.basicConfig(level=logging.INFO)
-
         try:
             self.auth_manager.login()
-
-            if self.check_free_product():
-                # проверка игры и отправка
-                game_name = self.check_game_name()
-                return game_name
-            else:
-                return False
-
+            return self.check()
         finally:
             self.auth_manager.close()
 
+    def check(self):
+        """Название игры, если карточка бесплатная, иначе False."""
+        if self.check_free_product():
+            # проверка игры и отправка
+            game_name = self.check_game_name()
+            return game_name
+        else:
+            return False
+
     def check_game_name(self):
         try:
             # Ждем загрузки элемента кнопки
@@ -146,38 +144,26 @@ class FreeProductParser:
         return None  # Возвращаем None, если текст не найден или произошла ошибка
 
 
-def run_bot(link, delay=0):
-    """Функция для запуска бота с возможной задержкой и обработкой ошибок"""
-    if delay > 0:
-        time.sleep(delay)  # Задержка перед началом
-
-    bot = FreeProductParser(link)
-    try:
-        return bot.run_checker()
-    except Exception as e:
-        logging.error(f"Общая ошибка при обработке: {e}")
+def run_bot(auth_manager, link, throttle=None):
+    """Проверка одной карточки в уже авторизованном браузере процесса пула"""
+    return FreeProductParser(link, auth_manager).check()
 
 
-def main(links):
+def main(links, max_processes=5):
     exist_free_cards = {}
-    results = []  # Список для хранения задач
-
-    # Настройка multiprocessing.Pool
-    max_processes = 5  # Максимальное количество параллельных процессов
-
-    with multiprocessing.Pool(processes=max_processes) as pool:
-        for link in links:
-            delay = random.uniform(1, 10)
-            result_game = pool.apply_async(run_bot, args=(link, delay))
-            results.append((link, result_game))  # Сохраняем задачи в список
 
-        pool.close()
-        pool.join()  # Ожидаем завершения всех процессов
+    # Процессы пула берут ссылки из общей очереди и переиспользуют браузер, начала задач разносит общий Pacer
+    with BrowserPool(run_bot, processes=max_processes) as pool:
+        task_links = {pool.submit(link): link for link in links}
+        results = pool.join()
 
     # Получаем результаты после завершения всех процессов
-    for link, result_game in results:
-        if result_game.get():
-            exist_free_cards[link] = result_game.get()
+    for task_id, link in task_links.items():
+        success, game_name = results.get(task_id, (False, None))
+        if not success:
+            logging.error(f"Общая ошибка при обработке: {game_name}")
+        elif game_name:
+            exist_free_cards[link] = game_name
 
     logging.info(f"Все процессы нахождения бесплатных карточек завершены.")
     return exist_free_cards
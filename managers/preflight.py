@@ -0,0 +1,50 @@
+from managers.config import ConfigError
+
+
+def check_section(config, asset_store, section_number, section_name, multi_server=False):
+    """Проверка пресетов одного раздела. Возвращает список найденных проблем (строки)."""
+    problems = []
+    if str(section_number) not in config.game_names:
+        problems.append(f"{section_name}: нет названия игры для раздела {section_number} в data/game_names.json")
+    elif multi_server:
+        try:
+            if not config.servers(section_number):
+                problems.append(f"{section_name}: пустой список серверов в data/server_names.json")
+        except ConfigError as e:
+            problems.append(f"{section_name}: {e}")
+
+    if not config.virt_description(section_name):
+        problems.append(f"{section_name}: нет описания 'virt_description' в data/descriptions.json")
+
+    try:
+        cards = config.cards(section_name)
+    except ConfigError as e:
+        return problems + [f"{section_name}: {e}"]
+    if not cards:
+        problems.append(f"{section_name}: файл chips/{section_name}/presets.json пуст")
+
+    for index, card in enumerate(cards, 1):
+        label = f"{section_name}: карточка {index} ('{card['name']}')"
+        if not card['name'].strip():
+            problems.append(f"{section_name}: карточка {index} без названия")
+        if card['amount'] <= 0:
+            problems.append(f"{label}: amount должен быть больше нуля")
+        if card['rawPrice'] <= 0 or card['price'] <= 0:
+            problems.append(f"{label}: цены должны быть больше нуля")
+        elif card['price'] > card['rawPrice']:
+            problems.append(f"{label}: цена со скидкой {card['price']} больше исходной {card['rawPrice']}")
+        if not asset_store.find_picture(section_name, card['amount']):
+            problems.append(f"{label}: нет картинки для amount {card['amount']}")
+    return problems
+
+
+def check_sections(config, asset_store, sections, multi_server_sections=()):
+    """Проверка пресетов, картинок, серверов и описаний разделов {номер раздела: папка в chips}
+    до запуска браузеров и запросов. Возвращает список найденных проблем (строки)."""
+    problems = []
+    if not config.product_data.strip():
+        problems.append("Пустой текст 'product_data.text' в data/descriptions.json")
+    for section_number, section_name in sections.items():
+        problems.extend(check_section(config, asset_store, section_number, section_name,
+                                      section_number in multi_server_sections))
+    return problems
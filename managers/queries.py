@@ -0,0 +1,68 @@
+import hashlib
+import os
+from functools import lru_cache
+
+# Каталог с GraphQL-операциями: одна операция на файл <operationName>.graphql
+QUERIES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "graphql")
+
+
+def hash_query(query):
+    return hashlib.sha256(query.encode('utf-8')).hexdigest()
+
+
+def load_queries(directory=QUERIES_DIR):
+    """Загрузка всех операций из каталога. Возвращает {имя: (текст запроса, sha256 текста)}."""
+    queries = {}
+    for filename in sorted(os.listdir(directory)):
+        name, extension = os.path.splitext(filename)
+        if extension != ".graphql":
+            continue
+        with open(os.path.join(directory, filename), 'r', encoding='utf-8') as file:
+            query = file.read().strip()
+        queries[name] = (query, hash_query(query))
+    return queries
+
+
+# Запросы читаются и хешируются один раз при импорте
+QUERIES = load_queries()
+
+
+def build_request(name, variables=None, persisted=False):
+    """Сборка тела GraphQL-запроса.
+
+    При persisted=True вместо текста запроса отправляется только его sha256 (Automatic Persisted Queries).
+    Если сервер еще не знает хеш, ReqManager повторит запрос с полным текстом (см. with_query).
+    """
+    query, sha256_hash = QUERIES[name]
+    data = {"operationName": name, "variables": variables or {}}
+    if persisted:
+        data["extensions"] = {"persistedQuery": {"version": 1, "sha256Hash": sha256_hash}}
+    else:
+        data["query"] = query
+    return data
+
+
+def with_query(data):
+    """Тело запроса с полным текстом операции (для повтора после PersistedQueryNotFound)."""
+    data = dict(data)
+    data["query"] = QUERIES[data["operationName"]][0]
+    return data
+
+
+@lru_cache(maxsize=None)
+def batch_remove_operation(size):
+    """Регистрация мутации удаления size карточек одним документом (алиасы d0..d{size-1})."""
+    name = f"removeItems{size}"
+    variables = ", ".join(f"$id{index}: UUID!" for index in range(size))
+    fields = "\n".join(f"  d{index}: removeItem(id: $id{index}) {{\n    id\n  }}" for index in range(size))
+    query = f"mutation {name}({variables}) {{\n{fields}\n}}"
+    QUERIES[name] = (query, hash_query(query))
+    return name
+
+
+def build_batch_remove_request(card_ids, persisted=False):
+    """Сборка запроса пакетного удаления. Возвращает (тело запроса, {алиас: id карточки})."""
+    name = batch_remove_operation(len(card_ids))
+    variables = {f"id{index}": card_id for index, card_id in enumerate(card_ids)}
+    aliases = {f"d{index}": card_id for index, card_id in enumerate(card_ids)}
+    return build_request(name, variables, persisted), aliases
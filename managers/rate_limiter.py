@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+
+class AdaptiveRateLimiter:
+    """Общий ограничитель частоты запросов (token bucket) с подстройкой скорости по AIMD.
+
+    Пока сервер отвечает 200, скорость растет на increase запросов в секунду. На 429/403 скорость
+    умножается на decrease, а все запросы приостанавливаются на время из Retry-After (если он есть).
+    """
+
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=20.0, burst=5, increase=0.1, decrease=0.5,
+                 throttle_pause=5.0):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.throttle_pause = throttle_pause
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Резервирование одного токена. Возвращает время ожидания в секундах.
+
+        Ожидание складывается из остатка общей паузы и долга по токенам: запросы, зарезервированные
+        во время паузы, после нее идут с интервалом 1/rate, а не одновременно.
+        """
+        with self.lock:
+            now = time.monotonic()
+            # Во время паузы токены не накапливаются, иначе после долгого Retry-After ушла бы целая пачка
+            elapsed = max(0.0, now - max(self.updated, self.paused_until))
+            self.tokens = min(self.burst, self.tokens + elapsed * self.rate)
+            self.updated = max(self.updated, now)
+            self.tokens -= 1
+
+            return max(0.0, self.paused_until - now) + max(0.0, -self.tokens / self.rate)
+
+    def acquire(self):
+        time.sleep(self.reserve())
+
+    async def acquire_async(self):
+        await asyncio.sleep(self.reserve())
+
+    def on_success(self):
+        """Аддитивное увеличение скорости после успешного ответа."""
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        """Мультипликативное снижение скорости и общая пауза после 429/403."""
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            pause = retry_after if retry_after is not None else self.throttle_pause
+            self.paused_until = max(self.paused_until, time.monotonic() + pause)
+            # Запросы, зарезервированные до паузы, не должны пройти сразу после нее всей пачкой
+            self.tokens = min(self.tokens, 0)
+        logging.warning(f"Сервер ограничил запросы. Пауза {pause:.1f} с, скорость снижена до {self.rate:.2f} запр/с.")
+
+    def update(self, response):
+        """Подстройка скорости по ответу сервера."""
+        if response.status_code in (429, 403):
+            self.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+        elif response.status_code == 200:
+            self.on_success()
+
+
+def parse_retry_after(value):
+    """Разбор заголовка Retry-After: число секунд или HTTP-дата."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+# Ограничитель, общий для всех GraphQL-клиентов процесса
+default_limiter = AdaptiveRateLimiter()
+
+
+if __name__ == '__main__':
+    # Проверка: после паузы запросы идут по одному с интервалом 1/rate, а не пачкой
+    limiter = AdaptiveRateLimiter(rate=2.0, decrease=0.5)
+    limiter.on_throttle(5.0)
+    waits = [limiter.reserve() for _ in range(10)]
+    steps = [later - earlier for earlier, later in zip(waits, waits[1:])]
+    assert 5.0 < waits[0] <= 5.0 + 1 / limiter.rate + 0.01, waits
+    assert all(abs(step - 1 / limiter.rate) < 0.01 for step in steps), waits
+    print("Ожидания после паузы:", [round(wait, 2) for wait in waits])
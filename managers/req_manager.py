@@ -0,0 +1,121 @@
+import json
+import logging
+
+from managers.config import BASE_URL, config_store
+from managers.graphql_client import AsyncGraphQLClient
+from managers.queries import build_request, with_query
+
+
+class ReqManager:
+    """Базовый класс для работы с GraphQL API playerok напрямую, без браузера."""
+
+    graphql_url = BASE_URL + "/graphql"
+
+    def __init__(self, cookies_file='data/cookies_data.ckjson', max_concurrency=20, timeout=30,
+                 persisted_queries=False, client=None):
+        self.cookies_file = cookies_file
+        self.persisted_queries = persisted_queries
+        self.cookies = self.load_cookies_from_file()
+        # Клиент можно передать из другого менеджера, чтобы у них были общие соединения и цикл событий
+        self.client = client or AsyncGraphQLClient(self.graphql_url, max_concurrency, timeout)
+        self.games = {}
+
+    def load_cookies_from_file(self):
+        """Загрузка куки из JSON-файла и приведение к нужному формату"""
+        with open(self.cookies_file, 'r') as f:
+            cookies = json.load(f)
+        # Приведение куки к строковому формату для заголовка
+        return '; '.join([f"{cookie['name']}={cookie['value']}" for cookie in cookies])
+
+    def load_section_names(self):
+        """Полные названия секций из снимка конфигурации."""
+        return dict(config_store.snapshot().game_names)
+
+    def find_game(self, game_name):
+        """Синхронная обертка над find_game_async."""
+        return self.client.run(self.find_game_async(game_name))
+
+    async def find_game_async(self, game_name):
+        """Поиск игры по полному названию. Возвращает узел игры с ее категориями или None."""
+        if game_name in self.games:
+            return self.games[game_name]
+
+        data = self.build_request("games", {"filter": {"search": game_name}, "pagination": {"first": 10}})
+        response_data = await self.send_graphql_async(data)
+        if not response_data:
+            return None
+
+        games = [edge['node'] for edge in response_data['games']['edges'] if edge['node']['name'] == game_name]
+        if not games:
+            logging.error(f"Игра '{game_name}' не найдена.")
+            return None
+        self.games[game_name] = games[0]
+        return games[0]
+
+    def get_common_headers(self):
+        return {
+            "Accept-Language": "en-US,en;q=0.9,ru;q=0.8",
+            "Apollo-Require-Preflight": "true",
+            "Apollographql-Client-Name": "web",
+            "Content-Type": "application/json",
+            "Cookie": self.cookies,
+        }
+
+    def send_graphql(self, data, retries=5, headers=None, files=None):
+        """Синхронная обертка над send_graphql_async."""
+        return self.client.run(self.send_graphql_async(data, retries, headers, files))
+
+    async def send_graphql_async(self, data, retries=5, headers=None, files=None):
+        """Отправка GraphQL-запроса с повторными попытками. Возвращает поле data ответа или None.
+
+        Если переданы files, запрос отправляется как multipart (GraphQL multipart request spec):
+        data уходит в поле operations, а files — словарь {путь к переменной: путь к файлу}.
+        """
+        headers = headers or self.get_common_headers()
+        operation = data.get("operationName")
+
+        for attempt in range(retries):
+            try:
+                response = await self.post_async(data, headers, files)
+
+                if response.status_code == 200:
+                    response_data = json.loads(response.text)
+                    if response_data.get("errors"):
+                        logging.error(f"Ошибка GraphQL в '{operation}': {response_data['errors']}")
+                        return None
+                    return response_data["data"]
+                elif response.status_code == 429:
+                    logging.error(f"Слишком много запросов. Попытка {attempt + 1} из {retries}. Ждем...")
+                elif response.status_code == 403:
+                    logging.error(f"Запрос заблокирован. Попытка {attempt + 1} из {retries}. Ждем...")
+                else:
+                    logging.error(f"Ошибка запроса '{operation}': {response.status_code}, {response.text}")
+            except Exception as e:
+                logging.error(f"Ошибка при попытке {attempt + 1}: {str(e)}")
+
+        return None
+
+    def build_request(self, name, variables=None):
+        """Тело запроса для операции из managers/graphql."""
+        return build_request(name, variables, self.persisted_queries)
+
+    async def post_async(self, data, headers=None, files=None):
+        """Отправка запроса. Если сервер не знает хеш persisted query, запрос повторяется с полным текстом."""
+        headers = headers or self.get_common_headers()
+        response = await self.client.post(data, headers, files)
+        if "query" not in data and response.status_code == 200 and self.is_persisted_query_not_found(response.text):
+            response = await self.client.post(with_query(data), headers, files)
+        return response
+
+    def is_persisted_query_not_found(self, response_text):
+        try:
+            errors = json.loads(response_text).get("errors") or []
+        except ValueError:
+            return False
+        return any(error.get("message") == "PersistedQueryNotFound"
+                   or (error.get("extensions") or {}).get("code") == "PERSISTED_QUERY_NOT_FOUND"
+                   for error in errors)
+
+    def close(self):
+        """Закрытие пула соединений."""
+        self.client.close()
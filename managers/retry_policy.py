@@ -0,0 +1,89 @@
+import logging
+import random
+import time
+
+from managers.metrics import metrics
+
+
+class RateLimited(Exception):
+    """Сайт попросил повторить позже ('Попробуйте позже', 429)."""
+
+
+class RetryBudgetExceeded(Exception):
+    """Время, отведенное на карточку, закончилось раньше, чем удалось выполнить шаг."""
+
+
+class RetryPolicy:
+    """Повтор шага с ограниченной экспоненциальной задержкой, случайным разбросом и бюджетом времени.
+
+    Ошибки делятся на три вида:
+    - ограничение сайта (rate_limit_errors) — повтор с отдельной, более долгой задержкой;
+    - фатальные (fatal_errors) — повтор не поможет, ошибка пробрасывается сразу;
+    - остальные (нет элемента, таймаут ожидания и т.п.) — обычный повтор.
+    """
+
+    RATE_LIMITED = "rate_limited"
+    FATAL = "fatal"
+    TRANSIENT = "transient"
+
+    def __init__(self, max_attempts=4, base_delay=2.0, max_delay=30.0, rate_limit_delay=20.0, jitter=0.5,
+                 fatal_errors=(), rate_limit_errors=(RateLimited,)):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rate_limit_delay = rate_limit_delay
+        self.jitter = jitter
+        self.fatal_errors = tuple(fatal_errors) + (RetryBudgetExceeded,)
+        self.rate_limit_errors = tuple(rate_limit_errors)
+
+    def classify(self, error):
+        if isinstance(error, self.fatal_errors):
+            return self.FATAL
+        if isinstance(error, self.rate_limit_errors):
+            return self.RATE_LIMITED
+        return self.TRANSIENT
+
+    def delay(self, attempt, kind=TRANSIENT):
+        """Задержка перед повтором номер attempt (с 1): удваивается, не больше max_delay, с разбросом jitter."""
+        base = self.rate_limit_delay if kind == self.RATE_LIMITED else self.base_delay
+        delay = min(self.max_delay, base * 2 ** (attempt - 1))
+        # Разброс не дает процессам пула повторять запросы одновременно
+        return delay * (1 - self.jitter * random.random())
+
+    def run(self, name, func, *args, deadline=None, throttle=None, **kwargs):
+        """Выполнение func(*args, **kwargs) с повторами. Возвращает результат func.
+
+        :param deadline: Момент time.monotonic(), после которого повторы прекращаются (бюджет времени карточки).
+        :param throttle: FleetThrottle пула: ограничение сайта ставит на паузу все процессы, а не только текущий.
+        """
+        for attempt in range(1, self.max_attempts + 1):
+            if throttle is not None:
+                throttle.wait()
+            start = time.monotonic()
+            try:
+                result = func(*args, **kwargs)
+                metrics.observe_step(name, time.monotonic() - start)
+                if attempt > 1:
+                    logging.info(f"Шаг '{name}' выполнен с попытки {attempt}.")
+                return result
+            except Exception as e:
+                metrics.observe_step(name, time.monotonic() - start, ok=False)
+                kind = self.classify(e)
+                if kind == self.FATAL:
+                    logging.error(f"Шаг '{name}' не выполнен, повтор не поможет: {e}")
+                    raise
+                if attempt == self.max_attempts:
+                    logging.error(f"Шаг '{name}' не выполнен за {self.max_attempts} попыток: {e}")
+                    raise
+
+                delay = self.delay(attempt, kind)
+                if deadline is not None and time.monotonic() + delay > deadline:
+                    raise RetryBudgetExceeded(f"Время на карточку закончилось на шаге '{name}': {e}") from e
+                metrics.count_retry(name, kind)
+                logging.warning(f"Попытка {attempt} из {self.max_attempts} для шага '{name}' не удалась ({kind}): "
+                                f"{e}. Повтор через {delay:.1f} с.")
+                if kind == self.RATE_LIMITED and throttle is not None:
+                    # Ожидание паузы — в throttle.wait() перед следующей попыткой
+                    throttle.on_throttle(delay)
+                else:
+                    time.sleep(delay)
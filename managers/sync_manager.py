@@ -0,0 +1,200 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+from managers.config import config_store
+
+
+class SyncManager:
+    """Сверка бесплатных карточек на сайте с пресетами chips/<игра>/presets.json.
+
+    Желаемое состояние — пресеты раздела (для игр с несколькими серверами — на каждом сервере из
+    data/server_names.json), текущее — бесплатные карточки пользователя в игре. Карточки сопоставляются
+    по (игра, сервер, название пресета): недостающие создаются, у карточек с другой ценой со скидкой
+    меняется цена, лишние удаляются, совпадающие не трогаются. Если отличается исходная цена
+    (rawPrice задается только при создании), карточка пересоздается.
+
+    Если сервер карточки определить не удалось (ошибка запроса атрибутов или категории), карточка
+    считается неизвестной: карточки с ее названием в этом разделе не создаются и не удаляются.
+    """
+
+    def __init__(self, create_mng, delete_mng):
+        self.create_mng = create_mng
+        self.delete_mng = delete_mng
+        self.config = config_store.snapshot()
+
+    def get_servers(self, section_number):
+        """Сервера раздела: список названий или [None] для игр без выбора сервера."""
+        if section_number in self.create_mng.MULTI_SERVER_SECTIONS:
+            return self.config.servers(section_number)
+        return [None]
+
+    def load_desired(self, sections):
+        """Желаемые карточки разделов {номер раздела: папка в chips}."""
+        desired = []
+        for section_number, section_name in sections.items():
+            cards = self.config.cards(section_name)
+            for server_name in self.get_servers(section_number):
+                for card in cards:
+                    desired.append({"section_number": section_number, "section_name": section_name,
+                                    "server": server_name, "card": card})
+        return desired
+
+    def load_live(self, sections):
+        """Текущие бесплатные карточки разделов с сервером, определенным по атрибутам.
+
+        У карточек, сервер которых не удалось определить из-за ошибки запроса, unknown=True.
+        """
+        # Категории загружаются заранее: resolve_category синхронный и не должен блокировать цикл событий
+        categories = {number: self.create_mng.resolve_category(number) for number in sections
+                      if number in self.create_mng.MULTI_SERVER_SECTIONS}
+        return self.delete_mng.client.run(self.load_live_async(sections, categories))
+
+    async def load_live_async(self, sections, categories):
+        async def load_section(section_number, section_name):
+            game_name = self.config.game_name(section_number)
+            nodes = [node for node in await self.delete_mng.get_game_items_async(game_name)
+                     if node['priority'] == "CUSTOM"]
+
+            # (сервер, неизвестен ли он): None — карточка не на сервере из списка
+            servers = [(None, False)] * len(nodes)
+            if section_number in categories:
+                category = categories[section_number]
+                if category is None:
+                    logging.error(f"Категория раздела {section_number} не загружена, сервера карточек неизвестны.")
+                    servers = [(None, True)] * len(nodes)
+                else:
+                    server_names = set(self.get_servers(section_number))
+                    options = [option for option in category['options'] if option['label'] in server_names]
+                    attributes = await asyncio.gather(
+                        *[self.delete_mng.get_item_attributes_async(node['id']) for node in nodes])
+                    servers = [(None, True) if item_attributes is None else
+                               (self.find_server(options, item_attributes), False) for item_attributes in attributes]
+
+            return [{"section_number": section_number, "section_name": section_name, "server": server,
+                     "unknown": unknown, "node": node} for node, (server, unknown) in zip(nodes, servers)]
+
+        live = []
+        for section_live in await asyncio.gather(*[load_section(number, name) for number, name in sections.items()]):
+            live.extend(section_live)
+        return live
+
+    @staticmethod
+    def find_server(options, attributes):
+        """Название сервера по атрибутам карточки. None, если сервер не из списка."""
+        for option in options:
+            if attributes and attributes.get(option['field']) == option['value']:
+                return option['label']
+        return None
+
+    @staticmethod
+    def diff(desired, live, match_raw_price=True):
+        """План изменений: {"create": [...], "update": [(живая, желаемая)], "delete": [...], "keep": [...],
+        "unknown": [...]}.
+
+        Одно название может встречаться в пресетах несколько раз с разными ценами, поэтому внутри
+        группы (раздел, сервер, название) сначала откладываются точные совпадения цен, затем оставшиеся
+        пары обновляются или пересоздаются. При match_raw_price=False карточка с другой исходной ценой
+        тоже попадает в update, а не пересоздается.
+
+        Карточки с неизвестным сервером попадают в unknown. Для их названия в разделе ничего не создается
+        и не удаляется: карточка может быть на любом сервере, и без нее сверка создала бы дубликат.
+        """
+        unknown = [entry for entry in live if entry.get('unknown')]
+        blocked = {(entry['section_number'], entry['node']['name']) for entry in unknown}
+
+        groups = defaultdict(lambda: ([], []))
+        for entry in desired:
+            groups[(entry['section_number'], entry['server'], entry['card']['name'])][0].append(entry)
+        for entry in live:
+            if not entry.get('unknown'):
+                groups[(entry['section_number'], entry['server'], entry['node']['name'])][1].append(entry)
+
+        plan = {"create": [], "update": [], "delete": [], "keep": [], "unknown": unknown}
+        for (section_number, _, name), (wanted, existing) in groups.items():
+            is_blocked = (section_number, name) in blocked
+            unmatched = []
+            for entry in wanted:
+                match = next((live_entry for live_entry in existing
+                              if live_entry['node']['rawPrice'] == entry['card']['rawPrice']
+                              and live_entry['node']['price'] == entry['card']['price']), None)
+                if match:
+                    existing.remove(match)
+                    plan["keep"].append(match)
+                else:
+                    unmatched.append(entry)
+
+            for entry in unmatched:
+                match = next((live_entry for live_entry in existing
+                              if not match_raw_price or live_entry['node']['rawPrice'] == entry['card']['rawPrice']),
+                             None)
+                if match:
+                    existing.remove(match)
+                    plan["update"].append((match, entry))
+                elif not is_blocked:
+                    plan["create"].append(entry)
+            if not is_blocked:
+                plan["delete"].extend(existing)
+        return plan
+
+    def apply(self, plan):
+        """Выполнение плана. Возвращает количество успешных операций каждого вида."""
+        done = {"create": 0, "update": 0, "delete": 0}
+
+        if plan["delete"]:
+            card_ids = [entry['node']['id'] for entry in plan["delete"]]
+            for success, message in self.delete_mng.delete_cards_batched(card_ids).values():
+                done["delete"] += success
+                if not success:
+                    logging.error(message)
+
+        done["update"] = self.apply_prices(plan["update"])
+
+        for entry in plan["create"]:
+            if self.create_mng.create_card(entry['section_number'], entry['section_name'], entry['card'],
+                                           self.config.product_data,
+                                           self.config.virt_description(entry['section_name']), entry['server']):
+                done["create"] += 1
+        return done
+
+    def apply_prices(self, updates):
+        """Одновременное изменение цен карточек из update плана. Возвращает количество успешных."""
+        if not updates:
+            return 0
+        results = self.create_mng.reprice_cards(
+            {live_entry['node']['id']: entry['card']['price'] for live_entry, entry in updates})
+        for live_entry, entry in updates:
+            if results[live_entry['node']['id']]:
+                logging.info(f"Цена карточки {live_entry['node']['slug']} изменена на {entry['card']['price']}")
+            else:
+                logging.error(f"Не удалось изменить цену карточки {live_entry['node']['slug']}")
+        return sum(results.values())
+
+    def reprice(self, sections, amount=None, dry_run=False):
+        """Изменение цен существующих карточек по пресетам без создания и удаления.
+
+        Карточки сопоставляются с пресетами так же, как при синхронизации, но без учета исходной цены.
+        Если задан amount, меняются только карточки пресетов с этим количеством виртов.
+        Возвращает (список пар (живая, желаемая), количество измененных или None при dry_run).
+        """
+        plan = self.diff(self.load_desired(sections), self.load_live(sections), match_raw_price=False)
+        # При другой исходной цене и той же цене со скидкой карточка попадает в update, но менять нечего
+        updates = [(live_entry, entry) for live_entry, entry in plan["update"]
+                   if live_entry['node']['price'] != entry['card']['price']
+                   and (amount is None or entry['card']['amount'] == amount)]
+        logging.info(f"Карточек для изменения цены: {len(updates)}")
+        if dry_run:
+            return updates, None
+        return updates, self.apply_prices(updates)
+
+    def sync(self, sections, dry_run=False):
+        """Сверка и приведение карточек разделов к пресетам. При dry_run только возвращает план."""
+        plan = self.diff(self.load_desired(sections), self.load_live(sections))
+        logging.info(f"План синхронизации: создать {len(plan['create'])}, изменить цену {len(plan['update'])}, "
+                     f"удалить {len(plan['delete'])}, без изменений {len(plan['keep'])}")
+        if plan["unknown"]:
+            logging.warning(f"Сервер не определен у {len(plan['unknown'])} карточек, карточки с их названиями "
+                            f"не создаются и не удаляются. Повторите синхронизацию позже.")
+        if dry_run:
+            return plan, None
+        return plan, self.apply(plan)